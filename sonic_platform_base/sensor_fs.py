@@ -8,6 +8,63 @@ from sonic_platform_base.sensor_base import SensorBase
 from sonic_platform_base.sensor_base import VoltageSensorBase
 from sonic_platform_base.sensor_base import CurrentSensorBase
 import logging
+import os
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+class _PollerPool(object):
+    """Daemon thread publishing the latest readings of file system sensors"""
+
+    def __init__(self):
+        self._sensors = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.interval = None
+
+    def register(self, sensor):
+        with self._lock:
+            self._sensors.add(sensor)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self):
+        with self._lock:
+            sensors = list(self._sensors)
+        for sensor in sensors:
+            sensor._latest = sensor._read()
+
+    def start(self, interval):
+        self.interval = interval
+        if self.is_running():
+            return
+        # Publish a first set of readings before getters switch over
+        self.poll()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sensor_fs_poller')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for sensor in self._sensors:
+                sensor._latest = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+
+_poller = _PollerPool()
 
 
 class SensorFs(SensorBase):
@@ -21,6 +78,20 @@ class SensorFs(SensorBase):
         'position': -1,
     }
 
+    # Seconds during which a reading is reused instead of re-reading sysfs
+    _TTL = 0.1
+
+    # Cached sysfs file descriptor and the path it was opened from
+    _fd = None
+    _fd_path = None
+
+    # Last successful reading and the monotonic time it was taken
+    _cache_val = None
+    _cache_ts = 0
+
+    # Reading published by the background poller, None when not polling
+    _latest = None
+
     def __init__(self, sensor_type='sensor', **kw):
 
         super(SensorFs, self).__init__()
@@ -34,20 +105,93 @@ class SensorFs(SensorBase):
         if (len(self.high_thresholds) != 3 or len(self.low_thresholds) != 3):
             raise Exception('{}: Missing sensor thresholds'.format(self.name))
 
+        self._ttl = kw.get('ttl', self._TTL)
+        self._lock = threading.Lock()
+
         self.minimum_sensor = self.get_value()
         self.maximum_sensor = self.minimum_sensor
 
+        _poller.register(self)
+
+    @classmethod
+    def start_polling(cls, interval):
+        """
+        Starts refreshing all file system sensors from a background thread
+        every 'interval' seconds; getters then return the published readings
+        """
+        _poller.start(interval)
+
+    @classmethod
+    def stop_polling(cls):
+        """Stops the background poller, getters read sysfs again"""
+        _poller.stop()
+
+    @classmethod
+    def read_many(cls, sensors):
+        """
+        Reads a batch of sensors in one pass over their cached file
+        descriptors, returns a dict mapping each sensor to its measurement
+        """
+        now = time.monotonic()
+        result = {}
+        for sensor in sensors:
+            value = sensor._read()
+            sensor._cache_val = value
+            sensor._cache_ts = now
+            result[sensor] = value
+        return result
+
     def get_name(self):
         """Returns the sensor name"""
         return self.name
 
+    def _read(self):
+        """
+        Reads the sensor file through a cached file descriptor,
+        returns None on failure
+        """
+        with self._lock:
+            try:
+                if self._fd is None or self._fd_path != self.sensor:
+                    self._close()
+                    self._fd = os.open(self.sensor, os.O_RDONLY)
+                    self._fd_path = self.sensor
+                return int(os.pread(self._fd, 32, 0).split(b'\n', 1)[0])
+            except:
+                # Drop the descriptor so that the next read reopens the file
+                self._close()
+                return None
+
     def get_value(self):
         """Returns the sensor measurement"""
-        try:
-            with open(self.sensor) as f:
-                return int(f.readline().rstrip())
-        except:
-            return None
+        latest = self._latest
+        if latest is not None:
+            return latest
+        now = time.monotonic()
+        if self._fd_path == self.sensor and now - self._cache_ts < self._ttl:
+            return self._cache_val
+        value = self._read()
+        self._cache_val = value
+        self._cache_ts = now
+        return value
+
+    def _close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+            self._fd_path = None
+
+    def close(self):
+        """Closes the cached sensor file descriptor"""
+        if self._fd is not None:
+            with self._lock:
+                self._close()
+
+    def __del__(self):
+        self.close()
 
     def get_high_threshold(self):
         """Returns the sensor high threshold value"""
@@ -110,9 +254,6 @@ class SensorFs(SensorBase):
     @staticmethod
     def factory(sensor_cls, sensors_data):
         """Factory method for retrieving a list of Sensor objects"""
-        logging.basicConfig()
-        logger = logging.getLogger()
-
         result = []
 
         for idx, sensor in enumerate(sensors_data):
@@ -120,7 +261,7 @@ class SensorFs(SensorBase):
             try:
                 result.append(sensor_cls(**sensor))
             except Exception as e:
-                logger.warning('Sensor.factory: {}'.format(e))
+                logger.warning('Sensor.factory: %s', e)
 
         return result
 
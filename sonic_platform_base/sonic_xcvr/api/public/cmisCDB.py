@@ -18,10 +18,37 @@ CDB_WRITE_MSG_START = 130
 PAGE_LENGTH = 128
 INIT_OFFSET = 128
 CMDLEN = 2
-MAX_WAIT = 600
+# CDB status polling: initial and maximum delay between reads, overall timeout (seconds)
+CDB_POLL_DELAY = 0.005
+CDB_FLAG_POLL_DELAY = 0.01
+CDB_POLL_MAX_DELAY = 0.2
+CDB_STATUS_TIMEOUT = 60
+
+_PACK_BE_U16 = struct.Struct('>H').pack_into
+_PACK_BE_U32 = struct.Struct('>I').pack_into
+
+
+def _cdb_finalize(cmd):
+    '''
+    Returns a CDB command with its check code filled in
+    '''
+    cmd = bytearray(cmd)
+    cmd[133-INIT_OFFSET] = 0xff - (sum(cmd) & 0xff)
+    return bytes(cmd)
 
 
 class CmisCdbApi(XcvrApi):
+    # Commands without parameters, check code included
+    _CMD_0000 = _cdb_finalize(b'\x00\x00\x00\x00\x02\x00\x00\x00\x00\x10')
+    _CMD_0040 = _cdb_finalize(b'\x00\x40\x00\x00\x00\x00\x00\x00')
+    _CMD_0041 = _cdb_finalize(b'\x00\x41\x00\x00\x00\x00\x00\x00')
+    _CMD_0100 = _cdb_finalize(b'\x01\x00\x00\x00\x00\x00\x00\x00')
+    _CMD_0102 = _cdb_finalize(b'\x01\x02\x00\x00\x00\x00\x00\x00')
+    _CMD_0107 = _cdb_finalize(b'\x01\x07\x00\x00\x00\x00\x00\x00')
+    _CMD_010A = _cdb_finalize(b'\x01\x0A\x00\x00\x00\x00\x00\x00')
+    # Run image template, delay to reset 512 ms, mode and check code patched per call
+    _CMD_0109 = b'\x01\x09\x00\x00\x04\x00\x00\x00\x00\x00\x02\x00'
+
     def __init__(self, xcvr_eeprom):
         super(CmisCdbApi, self).__init__(xcvr_eeprom)
         self.cdb_instance_supported = self.xcvr_eeprom.read(consts.CDB_SUPPORT)
@@ -55,6 +82,8 @@ class CmisCdbApi(XcvrApi):
         Bit 0: L-ModuleStateChanged Latched Flag to indicate a Module State Change
         '''
         status = self.xcvr_eeprom.read(consts.MODULE_FIRMWARE_FAULT_INFO)
+        if status is None:
+            return True
         datapath_firmware_fault = bool((status >> 2) & 0x1)
         module_firmware_fault = bool((status >> 1) & 0x1)
         cdb1_command_complete = bool((status >> 6) & 0x1)
@@ -65,16 +94,32 @@ class CmisCdbApi(XcvrApi):
         else:
             return True
 
+    def cdb1_wait_complete(self, deadline=None):
+        '''
+        This function polls the CDB1 command complete flag until it is set,
+        backing off from 10 ms to 200 ms between reads, until the monotonic
+        deadline (default CDB_STATUS_TIMEOUT seconds from now).
+        It returns True if the command completed and False on timeout.
+        A firmware fault raises AssertionError as in cdb1_chkflags()
+        '''
+        delay = CDB_FLAG_POLL_DELAY
+        if deadline is None:
+            deadline = time.monotonic() + CDB_STATUS_TIMEOUT
+        while True:
+            if not self.cdb1_chkflags():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, CDB_POLL_MAX_DELAY)
+
     def cdb_chkcode(self, cmd):
         '''
         This function calculates and returns the checksum of a CDB command
         '''
-        checksum = 0
-        for byte in cmd:
-            checksum += byte
-        return 0xff - (checksum & 0xff)
+        return 0xff - (sum(cmd) & 0xff)
 
-    def cdb1_chkstatus(self):
+    def cdb1_chkstatus(self, deadline=None):
         '''
         This function checks the CDB status.
         The format of returned values is busy flag, failed flag and cause
@@ -122,21 +167,57 @@ class CmisCdbApi(XcvrApi):
         '''
         status = self.xcvr_eeprom.read(consts.CDB1_STATUS)
         is_busy = bool(((0x80 if status is None else status) >> 7) & 0x1)
-        cnt = 0
-        while is_busy and cnt < MAX_WAIT:
-            time.sleep(0.1)
+        delay = CDB_POLL_DELAY
+        if deadline is None:
+            deadline = time.monotonic() + CDB_STATUS_TIMEOUT
+        while is_busy and time.monotonic() < deadline:
+            # Most commands complete within a few ms, back off for the slow ones
+            time.sleep(delay)
+            delay = min(delay * 2, CDB_POLL_MAX_DELAY)
             status = self.xcvr_eeprom.read(consts.CDB1_STATUS)
             is_busy = bool(((0x80 if status is None else status) >> 7) & 0x1)
-            cnt += 1
         return status
 
     def write_cdb(self, cmd):
         '''
         This function writes a CDB command to page 0x9f
+        Writing the command ID (bytes 128-129) triggers execution, so it must
+        land after the rest of the message. The two writes cannot be merged
+        into one since the EEPROM driver may split a long write into several
+        bus transactions, starting with the command ID.
         '''
         self.xcvr_eeprom.write_raw(LPLPAGE*PAGE_LENGTH+CDB_WRITE_MSG_START, len(cmd)-CMDLEN, cmd[CMDLEN:])
         self.xcvr_eeprom.write_raw(LPLPAGE*PAGE_LENGTH+INIT_OFFSET, CMDLEN, cmd[:CMDLEN])
 
+    def _issue_cdb(self, cmd, name):
+        '''
+        This function writes a CDB command, waits for it to complete and logs
+        the outcome under the given command name.
+        The status register is only read once the command complete flag is
+        set, as right after the write it may still hold the previous result.
+        Both waits share one CDB_STATUS_TIMEOUT deadline.
+        It returns the CDB status. A firmware fault flagged while waiting
+        clears the latched flags, so it is logged and raised as AssertionError
+        '''
+        self.write_cdb(cmd)
+        deadline = time.monotonic() + CDB_STATUS_TIMEOUT
+        try:
+            if not self.cdb1_wait_complete(deadline):
+                logger.warning('%s: timed out waiting for CDB command completion', name)
+        except AssertionError:
+            logger.error('%s: firmware fault while waiting for CDB command completion', name)
+            raise
+        status = self.cdb1_chkstatus(deadline)
+        if (status != 0x1):
+            if status > 127:
+                logger.info('%s status: Busy', name)
+            else:
+                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
+                logger.info('%s status: Fail- %s', name, status_txt)
+        else:
+            logger.info('%s status: Success', name)
+        return status
+
     def read_cdb(self):
         '''
         This function reads the reply of a CDB command from page 0x9f.
@@ -157,19 +238,8 @@ class CmisCdbApi(XcvrApi):
         status and to perform a test of the CDB interface.
         It returns the reply message of this CDB command 0000h.
         '''
-        cmd = bytearray(b'\x00\x00\x00\x00\x02\x00\x00\x00\x00\x10')
-        cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Query CDB status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Query CDB status: Fail- ' + status_txt
-        else:
-            txt = 'Query CDB status: Success'
-        logger.info(txt)
+        cmd = bytearray(self._CMD_0000)
+        self._issue_cdb(cmd, 'Query CDB')
         return self.read_cdb()
 
     # Enter password
@@ -180,40 +250,18 @@ class CmisCdbApi(XcvrApi):
         password in Page 9Fh, Byte 136-139.
         It returns the status of CDB command 0001h
         '''
-        psw = struct.pack('>L', psw)
-        cmd = bytearray(b'\x00\x01\x00\x00\x04\x00\x00\x00') + psw
+        cmd = bytearray(b'\x00\x01\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00')
+        _PACK_BE_U32(cmd, 136-INIT_OFFSET, psw)
         cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Enter password status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Enter password status: Fail- ' + status_txt
-        else:
-            txt = 'Enter password status: Success'
-        logger.info(txt)
-        return status
+        return self._issue_cdb(cmd, 'Enter password')
 
     def get_module_feature(self):
         '''
         This command is used to query which CDB commands are supported.
         It returns the reply message of this CDB command 0040h.
         '''
-        cmd = bytearray(b'\x00\x40\x00\x00\x00\x00\x00\x00')
-        cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Get module feature status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Get module feature status: Fail- ' + status_txt
-        else:
-            txt = 'Get module feature status: Success'
-        logger.info(txt)
+        cmd = bytearray(self._CMD_0040)
+        self._issue_cdb(cmd, 'Get module feature')
         return self.read_cdb()
 
     # Firmware Update Features Supported
@@ -222,19 +270,8 @@ class CmisCdbApi(XcvrApi):
         This command is used to query supported firmware update features
         It returns the reply message of this CDB command 0041h.
         '''
-        cmd = bytearray(b'\x00\x41\x00\x00\x00\x00\x00\x00')
-        cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Get firmware management feature status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Get firmware management feature status: Fail- ' + status_txt
-        else:
-            txt = 'Get firmware management feature status: Success'
-        logger.info(txt)
+        cmd = bytearray(self._CMD_0041)
+        self._issue_cdb(cmd, 'Get firmware management feature')
         return self.read_cdb()
 
     # Get FW info
@@ -244,19 +281,8 @@ class CmisCdbApi(XcvrApi):
         images that reside in the module
         It returns the reply message of this CDB command 0100h.
         '''
-        cmd = bytearray(b'\x01\x00\x00\x00\x00\x00\x00\x00')
-        cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Get firmware info status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Get firmware info status: Fail- ' + status_txt
-        else:
-            txt = 'Get firmware info status: Success'
-        logger.info(txt)
+        cmd = bytearray(self._CMD_0100)
+        self._issue_cdb(cmd, 'Get firmware info')
         return self.read_cdb()
 
     # Start FW download
@@ -267,28 +293,13 @@ class CmisCdbApi(XcvrApi):
         '''
         # pwd_status = self.module_enter_password()
         # logger.info('Module password enter status is %d' %pwd_status)
-        logger.info("Image size is {}".format(imagesize))
+        logger.debug('Image size is %d', imagesize)
         cmd = bytearray(b'\x01\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00')
         cmd[132-INIT_OFFSET] = startLPLsize + 8
-        cmd[136-INIT_OFFSET] = (imagesize >> 24) & 0xff
-        cmd[137-INIT_OFFSET] = (imagesize >> 16) & 0xff
-        cmd[138-INIT_OFFSET] = (imagesize >> 8)  & 0xff
-        cmd[139-INIT_OFFSET] = (imagesize >> 0)  & 0xff
+        _PACK_BE_U32(cmd, 136-INIT_OFFSET, imagesize)
         cmd += header
         cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        time.sleep(2)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Start firmware download status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Start firmware download status: Fail- ' + status_txt
-        else:
-            txt = 'Start firmware download status: Success'
-        logger.info(txt)
-        return status
+        return self._issue_cdb(cmd, 'Start firmware download')
 
     # Abort FW download
     def abort_fw_download(self):
@@ -298,20 +309,8 @@ class CmisCdbApi(XcvrApi):
         '''
         # pwd_status = self.module_enter_password()
         # logger.info('Module password enter status is %d' %pwd_status)
-        cmd = bytearray(b'\x01\x02\x00\x00\x00\x00\x00\x00')
-        cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Abort firmware download status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Abort firmware download status: Fail- ' + status_txt
-        else:
-            txt = 'Abort firmware download status: Success'
-        logger.info(txt)
-        return status
+        cmd = bytearray(self._CMD_0102)
+        return self._issue_cdb(cmd, 'Abort firmware download')
 
     # Download FW with LPL
     def block_write_lpl(self, addr, data):
@@ -321,28 +320,14 @@ class CmisCdbApi(XcvrApi):
         '''
         # lpl_len includes 136-139, four bytes, data is 116-byte long.
         lpl_len = len(data) + 4
-        cmd = bytearray(b'\x01\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00')
-        cmd[132-INIT_OFFSET] = lpl_len & 0xff
-        cmd[136-INIT_OFFSET] = (addr >> 24) & 0xff
-        cmd[137-INIT_OFFSET] = (addr >> 16) & 0xff
-        cmd[138-INIT_OFFSET] = (addr >> 8)  & 0xff
-        cmd[139-INIT_OFFSET] = (addr >> 0)  & 0xff
         # pad data to 116 bytes just in case, make sure to fill all 0x9f page
-        paddedPayload = data.ljust(116, b'\x00')
-        cmd += paddedPayload
+        cmd = bytearray(140-INIT_OFFSET + max(len(data), 116))
+        cmd[0:CMDLEN] = b'\x01\x03'
+        cmd[132-INIT_OFFSET] = lpl_len & 0xff
+        _PACK_BE_U32(cmd, 136-INIT_OFFSET, addr)
+        cmd[140-INIT_OFFSET:140-INIT_OFFSET+len(data)] = data
         cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'LPL firmware download status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'LPL firmware download status: Fail- ' + status_txt
-        else:
-            txt = 'LPL firmware download status: Success'
-        logger.info(txt)
-        return status
+        return self._issue_cdb(cmd, 'LPL firmware download')
 
     #  Download FW with EPL
     def block_write_epl(self, addr, data, autopaging_flag, writelength):
@@ -351,6 +336,8 @@ class CmisCdbApi(XcvrApi):
         It returns the status of CDB command 0104h
         '''
         epl_len = len(data)
+        # Slice a view of the image block so that each chunk is not copied
+        data = memoryview(data)
         subtime = time.time()
         if not autopaging_flag:
             pages = epl_len // PAGE_LENGTH
@@ -378,25 +365,12 @@ class CmisCdbApi(XcvrApi):
                     datachunk = data[offset : ]
                     self.xcvr_eeprom.write_raw(0xA0*PAGE_LENGTH+offset+INIT_OFFSET, len(datachunk), datachunk)
         subtimeint = time.time()-subtime
-        logger.info('%dB write time:  %.2fs' %(epl_len, subtimeint))
-        cmd = bytearray(b'\x01\x04\x08\x00\x04\x00\x00\x00')
-        addr_byte = struct.pack('>L',addr)
-        cmd += addr_byte
-        cmd[130-INIT_OFFSET] = (epl_len >> 8) & 0xff
-        cmd[131-INIT_OFFSET] =  epl_len       & 0xff
+        logger.info('%dB write time:  %.2fs', epl_len, subtimeint)
+        cmd = bytearray(b'\x01\x04\x08\x00\x04\x00\x00\x00\x00\x00\x00\x00')
+        _PACK_BE_U16(cmd, 130-INIT_OFFSET, epl_len)
+        _PACK_BE_U32(cmd, 136-INIT_OFFSET, addr)
         cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'EPL firmware download status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'EPL firmware download status: Fail- ' + status_txt
-        else:
-            txt = 'EPL firmware download status: Success'
-        logger.info(txt)
-        return status
+        return self._issue_cdb(cmd, 'EPL firmware download')
 
     # FW download complete
     def validate_fw_image(self):
@@ -405,20 +379,8 @@ class CmisCdbApi(XcvrApi):
         image and then return success or failure
         It returns the status of CDB command 0107h
         '''
-        cmd = bytearray(b'\x01\x07\x00\x00\x00\x00\x00\x00')
-        cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Firmware download complete status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Firmware download complete status: Fail- ' + status_txt
-        else:
-            txt = 'Firmware download complete status: Success'
-        logger.info(txt)
-        return status
+        cmd = bytearray(self._CMD_0107)
+        return self._issue_cdb(cmd, 'Firmware download complete')
 
     # Run FW image
     # mode:
@@ -431,22 +393,11 @@ class CmisCdbApi(XcvrApi):
         The host uses this command to run a selected image from module internal firmware banks
         It returns the status of CDB command 0109h
         '''
-        cmd = bytearray(b'\x01\x09\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00')
+        cmd = bytearray(self._CMD_0109)
         cmd[137-INIT_OFFSET] = mode
-        cmd[138-INIT_OFFSET] = 2 # Delay to Reset 512 ms
         cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
         delay = int.from_bytes(cmd[138-INIT_OFFSET:138+2-INIT_OFFSET], byteorder='big') + 50 # Add few ms on setting time.
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Run firmware status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Run firmware status: Fail- ' + status_txt
-        else:
-            txt = 'Run firmware status: Success'
-        logger.info(txt)
+        status = self._issue_cdb(cmd, 'Run firmware')
         time.sleep(delay/1000) # Wait "delay time" to avoid other cmd sent before "run_fw_image" start.
         return status
 
@@ -465,17 +416,5 @@ class CmisCdbApi(XcvrApi):
 
         It returns the status of CDB command 010Ah
         '''
-        cmd = bytearray(b'\x01\x0A\x00\x00\x00\x00\x00\x00')
-        cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
-        self.write_cdb(cmd)
-        status = self.cdb1_chkstatus()
-        if (status != 0x1):
-            if status > 127:
-                txt = 'Commit firmware status: Busy'
-            else:
-                status_txt = self.failed_status_dict.get(status & 0x3f, "Unknown")
-                txt = 'Commit firmware status: Fail- ' + status_txt
-        else:
-            txt = 'Commit firmware status: Success'
-        logger.info(txt)
-        return status
+        cmd = bytearray(self._CMD_010A)
+        return self._issue_cdb(cmd, 'Commit firmware')
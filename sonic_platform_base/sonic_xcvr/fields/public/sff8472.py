@@ -1,5 +1,3 @@
-import struct
-
 from ..xcvr_field import NumberRegField
 from .. import consts
 
@@ -11,7 +9,7 @@ class TempField(NumberRegField):
     def decode(self, raw_data, **decoded_deps):
         int_cal = decoded_deps.get(consts.INT_CAL_FIELD)
         ext_cal = decoded_deps.get(consts.EXT_CAL_FIELD)
-        measured_val = struct.unpack(self.format, raw_data)[0]
+        measured_val = self._struct.unpack(raw_data)[0]
         if int_cal:
             return measured_val / self.scale
         elif ext_cal:
@@ -29,7 +27,7 @@ class VoltageField(NumberRegField):
     def decode(self, raw_data, **decoded_deps):
         int_cal = decoded_deps.get(consts.INT_CAL_FIELD)
         ext_cal = decoded_deps.get(consts.EXT_CAL_FIELD)
-        measured_val = struct.unpack(self.format, raw_data)[0]
+        measured_val = self._struct.unpack(raw_data)[0]
         if int_cal:
             return measured_val / self.scale
         elif ext_cal:
@@ -47,7 +45,7 @@ class TxBiasField(NumberRegField):
     def decode(self, raw_data, **decoded_deps):
         int_cal = decoded_deps.get(consts.INT_CAL_FIELD)
         ext_cal = decoded_deps.get(consts.EXT_CAL_FIELD)
-        measured_val = struct.unpack(self.format, raw_data)[0]
+        measured_val = self._struct.unpack(raw_data)[0]
         if int_cal:
             return measured_val / self.scale
         elif ext_cal:
@@ -65,7 +63,7 @@ class TxPowerField(NumberRegField):
     def decode(self, raw_data, **decoded_deps):
         int_cal = decoded_deps.get(consts.INT_CAL_FIELD)
         ext_cal = decoded_deps.get(consts.EXT_CAL_FIELD)
-        measured_val = struct.unpack(self.format, raw_data)[0]
+        measured_val = self._struct.unpack(raw_data)[0]
         if int_cal:
             return measured_val / self.scale
         elif ext_cal:
@@ -84,7 +82,7 @@ class RxPowerField(NumberRegField):
     def decode(self, raw_data, **decoded_deps):
         int_cal = decoded_deps.get(consts.INT_CAL_FIELD)
         ext_cal = decoded_deps.get(consts.EXT_CAL_FIELD)
-        measured_val = struct.unpack(self.format, raw_data)[0]
+        measured_val = self._struct.unpack(raw_data)[0]
         if int_cal:
             return measured_val / self.scale
         elif ext_cal:
@@ -5,6 +5,14 @@
 """
 
 import struct
+import sys
+
+if sys.version_info >= (3, 8):
+    def _hex_pairs(raw_data):
+        return bytes(raw_data).hex('-')
+else:
+    def _hex_pairs(raw_data):
+        return '-'.join([ "%02x" % byte for byte in raw_data])
 
 class XcvrField(object):
     """
@@ -21,17 +29,22 @@ class XcvrField(object):
         self.ro = kwargs.get("ro", True)
         self.deps = kwargs.get("deps", [])
         self.bitmask = None
+        self._flat_fields = None
 
     def get_fields(self):
         """
         Return: dict containing all fields nested within this field
         """
-        fields = {}
-        if hasattr(self, "fields"):
-            for field in self.fields:
+        if self._flat_fields is None:
+            fields = {}
+            # Depth-first, parents before their children
+            stack = list(reversed(getattr(self, "fields", ())))
+            while stack:
+                field = stack.pop()
                 fields[field.name] = field
-                fields.update(field.get_fields())
-        return fields
+                stack.extend(reversed(getattr(field, "fields", ())))
+            self._flat_fields = fields
+        return self._flat_fields
 
     def get_offset(self):
         """
@@ -88,6 +101,9 @@ class RegBitField(XcvrField):
         assert bitpos < 64
         self.bitpos = bitpos
         self.bitmask = 1 << self.bitpos
+        # Masks within the byte holding this bit
+        self._set_mask = 1 << (self.bitpos % 8)
+        self._clear_mask = ~self._set_mask & 0xff
 
     def get_size(self):
         return 1
@@ -96,16 +112,12 @@ class RegBitField(XcvrField):
         return True
 
     def decode(self, raw_data, **decoded_deps):
-        return bool((raw_data[0] >> self.bitpos % 8) & 1)
+        return bool(raw_data[0] & self._set_mask)
 
     def encode(self, val, raw_state=None):
         assert not self.ro and raw_state is not None
-        curr_state = raw_state[0]
-        if val:
-            curr_state |= (1 << self.bitpos % 8)
-        else:
-            curr_state &= ~(1 << self.bitpos % 8)
-        return bytearray([curr_state])
+        curr_state = (raw_state[0] | self._set_mask) if val else (raw_state[0] & self._clear_mask)
+        return bytearray((curr_state,))
 
 class RegBitsField(XcvrField):
     """
@@ -149,6 +161,7 @@ class RegField(XcvrField):
         self.size = kwargs.get("size", 1)
         self.start_bitpos = self.size * 8 - 1 # max bitpos
         self._update_bit_offsets()
+        self._bitmask = self._compute_bitmask()
 
     def _update_bit_offsets(self):
         for field in self.fields:
@@ -156,7 +169,7 @@ class RegField(XcvrField):
             field.offset = self.offset + field.bitpos // 8
             self.start_bitpos = min(field.bitpos, self.start_bitpos)
 
-    def get_bitmask(self):
+    def _compute_bitmask(self):
         if not self.fields:
             return None
         mask = 0
@@ -164,6 +177,9 @@ class RegField(XcvrField):
             mask |= field.bitmask
         return mask
 
+    def get_bitmask(self):
+        return self._bitmask
+
     def get_size(self):
         return self.size
 
@@ -178,10 +194,11 @@ class NumberRegField(RegField):
         super(NumberRegField, self).__init__(name, offset, *fields, **kwargs)
         self.scale = kwargs.get("scale")
         self.format = kwargs.get("format", "B")
+        self._struct = struct.Struct(self.format)
 
     def decode(self, raw_data, **decoded_deps):
-        decoded = struct.unpack(self.format, raw_data)[0]
-        mask = self.get_bitmask()
+        decoded = self._struct.unpack(raw_data)[0]
+        mask = self._bitmask
         if mask is not None:
             decoded &= mask
             decoded >>= self.start_bitpos
@@ -192,8 +209,8 @@ class NumberRegField(RegField):
     def encode(self, val, raw_state=None):
         assert not self.ro
         if self.scale is not None:
-            return bytearray(struct.pack(self.format, int(val * self.scale)))
-        return bytearray(struct.pack(self.format, val))
+            return bytearray(self._struct.pack(int(val * self.scale)))
+        return bytearray(self._struct.pack(val))
 
 class FixedNumberRegField(NumberRegField):
     """
@@ -219,9 +236,10 @@ class StringRegField(RegField):
         super(StringRegField, self).__init__(name, offset, *fields, **kwargs)
         self.encoding = kwargs.get("encoding", "ascii")
         self.format = kwargs.get("format", ">%ds" % self.size)
+        self._struct = struct.Struct(self.format)
 
     def decode(self, raw_data, **decoded_deps):
-        return struct.unpack(self.format, raw_data)[0].decode(self.encoding, 'ignore')
+        return self._struct.unpack(raw_data)[0].decode(self.encoding, 'ignore')
 
 class CodeRegField(RegField):
     """
@@ -231,10 +249,11 @@ class CodeRegField(RegField):
         super(CodeRegField, self).__init__(name, offset, *fields, **kwargs)
         self.code_dict = code_dict
         self.format = kwargs.get("format", "B")
+        self._struct = struct.Struct(self.format)
 
     def decode(self, raw_data, **decoded_deps):
-        code = struct.unpack(self.format, raw_data)[0]
-        mask = self.get_bitmask()
+        code = self._struct.unpack(raw_data)[0]
+        mask = self._bitmask
         if mask is not None:
             code &= mask
             code >>= self.start_bitpos
@@ -248,7 +267,7 @@ class HexRegField(RegField):
         super(HexRegField, self).__init__(name, offset, *fields, **kwargs)
 
     def decode(self, raw_data, **decoded_deps):
-        return '-'.join([ "%02x" % byte for byte in raw_data])
+        return _hex_pairs(raw_data)
 
 class ServerFWVersionRegField(RegField):
     """
@@ -268,7 +287,7 @@ class ServerFWVersionRegField(RegField):
             for i in range(0, server_fw_version_size, server_fw_version_number_size)
         )
 
-        return raw_data, server_fw_version_str
+        return bytearray(raw_data), server_fw_version_str
 
 class RegGroupField(XcvrField):
     """
@@ -282,14 +301,33 @@ class RegGroupField(XcvrField):
     def __init__(self, name, *fields, **kwargs):
         super(RegGroupField, self).__init__(name, fields[0].get_offset(), **kwargs)
         self.fields = fields
+        self._size = self._compute_size()
+        self._members, self._dep_members = self._slice_members()
 
-    def get_size(self):
+    def _slice_members(self):
+        """
+        Return: (name, field, start, end, deps) per member field, split by whether the
+        field has dependencies; start and end are relative to this field's offset
+        """
+        members = []
+        dep_members = []
+        for field in self.fields:
+            start = field.get_offset() - self.offset
+            deps = field.get_deps()
+            member = (field.name, field, start, start + field.get_size(), deps)
+            (dep_members if deps else members).append(member)
+        return members, dep_members
+
+    def _compute_size(self):
         start = self.offset
         end = start
         for field in self.fields:
             end = max(end, field.get_offset() + field.get_size())
         return end - start
 
+    def get_size(self):
+        return self._size
+
     def read_before_write(self):
         return False
 
@@ -298,21 +336,15 @@ class RegGroupField(XcvrField):
             Return: a dict mapping member field names to their decoded results
         """
         result = {}
-        start = self.offset
-        for field in self.fields:
-            offset = field.get_offset()
-            if not field.get_deps():
-                result[field.name] = field.decode(raw_data[offset - start: offset + field.get_size() - start],
-                                              **decoded_deps)
+        # Members decode slices of a view, not copies of raw_data
+        raw_view = memoryview(raw_data)
+        for name, field, start, end, _ in self._members:
+            result[name] = field.decode(raw_view[start:end], **decoded_deps)
 
         # Now decode any fields that have dependant fields in the same RegGroupField scope
-        for field in self.fields:
-            offset = field.get_offset()
-            deps = field.get_deps()
-            if deps:
-                decoded_deps.update({dep: result[dep] for dep in deps if dep in result})
-                result[field.name] = field.decode(raw_data[offset - start: offset + field.get_size() - start],
-                                                **decoded_deps)
+        for name, field, start, end, deps in self._dep_members:
+            decoded_deps.update({dep: result[dep] for dep in deps if dep in result})
+            result[name] = field.decode(raw_view[start:end], **decoded_deps)
         return result
 
 class DateField(StringRegField):
@@ -5,26 +5,139 @@ test server simulating the physical y-cable.
 
 Mux simulator documentation: https://github.com/Azure/sonic-mgmt/blob/master/ansible/roles/vm_set/files/mux_simulator.md
 """
+import concurrent.futures
+import functools
+import http.client
 import json
 import os
-import urllib.request
-import urllib.error
+import threading
 import time
+import urllib.parse
 
 from sonic_py_common import device_info
 from portconfig import get_port_config
 from natsort import natsorted
 from sonic_y_cable.y_cable_base import YCableBase
 
+try:
+    # orjson is optional, it works on bytes directly and is much faster than json
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data):
+        return json.dumps(data).encode('utf-8')
+
+    _json_loads = json.loads
+
+
+class _HttpConnectionPool(object):
+    """Keep-alive HTTP connections to the mux simulator, shared by all simulated y-cables.
+
+    urllib.request closes the connection after every request, so each call used to pay for a new TCP handshake.
+    """
+
+    # Errors raised when a pooled connection has been closed by the server while idle
+    STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+    def __init__(self, maxsize=16):
+        self._maxsize = maxsize
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, host, port, timeout):
+        with self._lock:
+            conns = self._idle.get((host, port))
+            conn = conns.pop() if conns else None
+        if conn is None:
+            return http.client.HTTPConnection(host, port, timeout=timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, host, port, conn):
+        with self._lock:
+            conns = self._idle.setdefault((host, port), [])
+            if len(conns) < self._maxsize:
+                conns.append(conn)
+                return
+        conn.close()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _split_url(url):
+        """Split url into (host, port, path), the driver only ever requests a handful of urls"""
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path = '{}?{}'.format(path, parts.query)
+        return parts.hostname, parts.port, path
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        """Send a request, return tuple of (HTTP status, response body)"""
+        host, port, path = self._split_url(url)
+
+        while True:
+            conn, reused = self._acquire(host, port, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                data = resp.read()
+            except self.STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused:
+                    continue  # Retry once on a fresh connection
+                raise
+            except Exception:
+                conn.close()
+                raise
+            self._release(host, port, conn)
+            return resp.status, data
+
+
+_connection_pool = _HttpConnectionPool()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_mux_simulator_config(path, mtime):
+    """Parse the mux simulator config file once for all ports, 'mtime' invalidates the cache on edit"""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_sorted_ports():
+    """Port config of this box and its interface names in natural order, shared by all ports"""
+    (platform, hwsku) = device_info.get_platform_and_hwsku()
+    ports, _, _ = get_port_config(hwsku, platform)
+    return ports, natsorted(ports.keys(), key=lambda y: y.lower())
+
+
+@functools.lru_cache(maxsize=None)
+def _build_port_index_map():
+    """Map each physical port to its (logical port index, interface name), first interface of the port wins"""
+    ports, intf_names = _get_sorted_ports()
+    port_map = {}
+    for port_index, intf_name in enumerate(intf_names):
+        port_map.setdefault(int(ports[intf_name]['index']), (port_index, intf_name))
+    return port_map
+
 
 class YCable(YCableBase):
 
+    __slots__ = ('_initialized', '_port_status', 'switching_mode', 'debug_mode', 'port_index', 'port_speed',
+                 '_vmset_url', '_url', '_reset_url', '_clear_counter_url', '_clear_counter_body', 'side', '_read_side',
+                 '_status_epoch', '_toggle_lock', '_toggle_target')
+
     EEPROM_ERROR = -1
 
     MUX_SIMULATOR_CONFIG_FILE = '/etc/sonic/mux_simulator.json'
 
     UPPER_TOR = 'upper_tor'
     LOWER_TOR = 'lower_tor'
+    _SIDE_TO_TARGET = {UPPER_TOR: YCableBase.TARGET_TOR_A, LOWER_TOR: YCableBase.TARGET_TOR_B}
     VENDOR = 'microsoft'
     PART_NUMBER = 'y-cable-simulated'
     VERSION = '0.0.1'
@@ -33,28 +146,63 @@ class YCable(YCableBase):
     NIC_VOLTAGE = 5.0
     LOCAL_VOLTAGE = 5.0
 
+    # The simulated y-cable only returns empty statistics, loopback mode and register dumps
+    _CAPS = 0
+
+    # BER of the 4 lanes of the simulated y-cable, a tuple so that it can be shared safely
+    _BER_ZEROS = (0, 0, 0, 0)
+
+    _POST_HEADERS = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+    _TOGGLE_BODIES = {side: _json_dumps({'active_side': side}) for side in (UPPER_TOR, LOWER_TOR)}
+
     POLL_TIMEOUT = 30
     POLL_INTERVAL = 1
     URLOPEN_TIMEOUT = 5
 
+    # Seconds during which the mux status of all ports of a vm_set is reused
+    STATUS_CACHE_TTL = 0.2
+
+    # vm_set url -> (monotonic time, {port_index: mux status})
+    _status_cache = {}
+
+    # vm_set url -> number of cache invalidations, a snapshot is only cached if no POST
+    # to the vm_set started or completed while it was being fetched
+    _status_gen = {}
+    _status_lock = threading.Lock()
+
+    # Seconds during which the mux status of this port is reused
+    PORT_STATUS_TTL = 0.1
+
+    # Workers posting the toggles requested in auto switching mode, shared by all ports
+    _toggle_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='y_cable_toggle')
+
     def __init__(self, port, logger):
         YCableBase.__init__(self, port, logger)
         if not os.path.exists(self.MUX_SIMULATOR_CONFIG_FILE) or not os.path.isfile(self.MUX_SIMULATOR_CONFIG_FILE):
             self.log_error('Missing {}, unable to initialize simulated y-cable.'.format(self.MUX_SIMULATOR_CONFIG_FILE))
 
         self._initialized = False
+        self._port_status = (0, None)  # (monotonic time, mux status)
+        self._status_epoch = 0  # Number of invalidations of _port_status
+        self._toggle_lock = threading.Condition()  # Notified when the queued background toggle is done
+        self._toggle_target = None  # Side the queued background toggle has to point the mux to
 
         self.switching_mode = self.SWITCHING_MODE_MANUAL
         self.debug_mode = False
         self._init_port_index()
         try:
-            mux_simulator = json.load(open(self.MUX_SIMULATOR_CONFIG_FILE))
+            mux_simulator = _load_mux_simulator_config(
+                self.MUX_SIMULATOR_CONFIG_FILE, os.path.getmtime(self.MUX_SIMULATOR_CONFIG_FILE))
             self._vmset_url = 'http://{}:{}/mux/{}'.format(
                 mux_simulator['server_ip'],
                 mux_simulator['server_port'],
                 mux_simulator['vm_set'])
             self._url = '{}/{}'.format(self._vmset_url, self.port_index)
+            self._reset_url = '{}/reset'.format(self._url)
+            self._clear_counter_url = '{}/clear_flap_counter'.format(self._vmset_url)
+            self._clear_counter_body = _json_dumps({'port_to_clear': str(self.port_index)})
             self.side = mux_simulator['side']  # Either "upper_tor" or "lower_tor"
+            self._read_side = self.TARGET_TOR_A if self.side == self.UPPER_TOR else self.TARGET_TOR_B
             self._initialized = True
             self.log_notice('Initialized simulated y_cable driver, port={}, index={}'.format(self.port, self.port_index))
         except Exception as e:
@@ -65,21 +213,13 @@ class YCable(YCableBase):
         """
         self.port_index = None
 
-        (platform, hwsku) = device_info.get_platform_and_hwsku()
-        ports, _, _ = get_port_config(hwsku, platform)
-
-        intf_names = natsorted(ports.keys(), key=lambda y: y.lower())
-
-        port_index = 0
-        for intf_name in intf_names:
-            physical_port = int(ports[intf_name]['index'])
-            if physical_port == self.port:
-                self.port_index = port_index
-                self.port_speed = int(ports[intf_name]['speed'])
-                return
-            port_index += 1
-        if self.port_index is None:
-            self.log_error('Failed to find index of physical port {}, ports={}'.format(self.port, json.dumps(ports)))
+        ports, _ = _get_sorted_ports()
+        port_map = _build_port_index_map()
+        if self.port in port_map:
+            self.port_index, intf_name = port_map[self.port]
+            self.port_speed = int(ports[intf_name]['speed'])
+        else:
+            self.log_error('Failed to find index of physical port {}, ports={}'.format(self.port, _json_dumps(ports).decode('utf-8')))
 
     def _get(self, url=None):
         if not self._initialized:
@@ -94,18 +234,16 @@ class YCable(YCableBase):
         attempt = 1
         while True:
             try:
-                try:
-                    req = urllib.request.Request(get_url)
-                    with urllib.request.urlopen(req, timeout=self.URLOPEN_TIMEOUT) as resp:
-                        return json.loads(resp.read().decode('utf-8'))
-                except urllib.error.HTTPError as e:
-                    self.log_warning('attempt={}, GET {} for physical_port {} failed with {}, detail: {}'.format(
-                        attempt,
-                        get_url,
-                        self.port,
-                        repr(e),
-                        e.read()))
-            except (urllib.error.URLError, json.decoder.JSONDecodeError, Exception) as e:
+                status, resp_data = _connection_pool.request('GET', get_url, timeout=self.URLOPEN_TIMEOUT)
+                if status < 400:
+                    return _json_loads(resp_data)
+                self.log_warning('attempt={}, GET {} for physical_port {} failed with HTTP status {}, detail: {}'.format(
+                    attempt,
+                    get_url,
+                    self.port,
+                    status,
+                    resp_data))
+            except (http.client.HTTPException, OSError, json.decoder.JSONDecodeError, Exception) as e:
                 self.log_warning('attempt={}, GET {} for physical_port {} failed with {}'.format(
                     attempt,
                     get_url,
@@ -132,17 +270,29 @@ class YCable(YCableBase):
 
         return None
 
-    def _post(self, url=None, data=None):
+    def _post(self, url=None, data=None, body=None):
+        """POST 'data' serialized to JSON, or the already serialized 'body', to url"""
         if not self._initialized:
             return None
 
+        # Any POST may change the mux status. Drop the cached statuses again once it completed,
+        # a getter running meanwhile may have cached the status from before the POST
+        self.invalidate_cache()
+        try:
+            return self._send_post(url, data, body)
+        finally:
+            self.invalidate_cache()
+
+    def _send_post(self, url, data, body):
         if url:
             post_url = url
         else:
             post_url = self._url
 
-        if data is not None:
-            post_data = json.dumps(data).encode('utf-8')
+        if body is not None:
+            post_data = body
+        elif data is not None:
+            post_data = _json_dumps(data)
         else:
             post_data = None
 
@@ -150,21 +300,19 @@ class YCable(YCableBase):
         attempt = 1
         while True:
             try:
-                try:
-                    headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
-                    req = urllib.request.Request(post_url, post_data, headers, method='POST')
-                    with urllib.request.urlopen(req, timeout=self.URLOPEN_TIMEOUT) as resp:
-                        return json.loads(resp.read().decode('utf-8'))
-                except urllib.error.HTTPError as e:
-                    self.log_warning('attempt={}, POST {} with data {} for physical_port {} failed with {}, detail: {}'.format(
-                        attempt,
-                        post_url,
-                        post_data,
-                        self.port,
-                        repr(e),
-                        e.read()
-                    ))
-            except (urllib.error.URLError, json.decoder.JSONDecodeError, Exception) as e:
+                status, resp_data = _connection_pool.request('POST', post_url, body=post_data, headers=self._POST_HEADERS,
+                                                             timeout=self.URLOPEN_TIMEOUT)
+                if status < 400:
+                    return _json_loads(resp_data)
+                self.log_warning('attempt={}, POST {} with data {} for physical_port {} failed with HTTP status {}, detail: {}'.format(
+                    attempt,
+                    post_url,
+                    post_data,
+                    self.port,
+                    status,
+                    resp_data
+                ))
+            except (http.client.HTTPException, OSError, json.decoder.JSONDecodeError, Exception) as e:
                 self.log_warning('attempt={}, POST {} with data {} for physical_port {} failed with {}'.format(
                         attempt,
                         post_url,
@@ -195,26 +343,177 @@ class YCable(YCableBase):
 
         return None
 
-    def _get_status(self):
-        if not self._initialized:
-            return None
+    @classmethod
+    def get_all_statuses(cls, vmset_url, logger=None):
+        """
+        Retrieves the mux status of all ports of a vm_set with a single request to the mux simulator.
+        The result is cached for STATUS_CACHE_TTL seconds so that polling every port of the vm_set
+        in a row costs one round-trip.
+
+        Args:
+            vmset_url:
+                 a string, url of the vm_set on the mux simulator
+            logger:
+                 optional logger failures are reported to
+
+        Returns:
+            a dict mapping the port index to its mux status, None if the request failed
+        """
+        now = time.monotonic()
+        cached = cls._status_cache.get(vmset_url)
+        if cached is not None and now - cached[0] < cls.STATUS_CACHE_TTL:
+            return cached[1]
+        gen = cls._status_gen.get(vmset_url, 0)
+
         try:
-            return self._get()
+            status, resp_data = _connection_pool.request('GET', vmset_url, timeout=cls.URLOPEN_TIMEOUT)
+            if status >= 400:
+                raise ValueError('HTTP status {}, detail: {}'.format(status, resp_data))
+            data = _json_loads(resp_data)
+            statuses = {}
+            for port_status in (data.values() if isinstance(data, dict) else data):
+                if isinstance(port_status, dict) and 'port_index' in port_status:
+                    statuses[int(port_status['port_index'])] = port_status
+            if not statuses and isinstance(data, dict):
+                # The statuses do not carry their port index, the mux simulator keys them by it
+                statuses = {int(key): port_status for key, port_status in data.items() if isinstance(port_status, dict)}
+            if not statuses:
+                raise ValueError('no mux status in {}'.format(resp_data))
         except Exception as e:
-            self.log_warning('Get {} failed, exception: {}'.format(self._url, repr(e)))
+            if logger is not None:
+                logger.log_warning('GET {} failed, exception: {}'.format(vmset_url, repr(e)))
             return None
 
+        with cls._status_lock:
+            if cls._status_gen.get(vmset_url, 0) == gen:
+                cls._status_cache[vmset_url] = (now, statuses)
+        return statuses
+
+    @classmethod
+    def gather_statuses(cls, cables, max_workers=16):
+        """
+        Retrieves the mux status of several ports concurrently, so that polling M ports
+        takes about one round-trip instead of M.
+
+        Args:
+            cables:
+                 a list of YCable instances
+            max_workers:
+                 an integer, maximum number of requests in flight
+
+        Returns:
+            a list with the mux status of each cable in the same order, None for failed ports
+        """
+        cables = list(cables)
+        if not cables:
+            return []
+        # Take one snapshot per vm_set up front instead of letting every worker race for it
+        loggers = {cable._vmset_url: cable._logger for cable in cables if cable._initialized}
+        for vmset_url, logger in loggers.items():
+            cls.get_all_statuses(vmset_url, logger)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(cables))) as executor:
+            return list(executor.map(lambda cable: cable._get_status(), cables))
+
+    def invalidate_cache(self):
+        """Drops the cached mux status of the port and of its vm_set, the next getter reads the mux simulator"""
+        with self._status_lock:
+            self._status_epoch += 1
+            self._port_status = (0, None)
+            if self._initialized:
+                self._status_gen[self._vmset_url] = self._status_gen.get(self._vmset_url, 0) + 1
+                self._status_cache.pop(self._vmset_url, None)
+
+    def _get_status(self):
+        if not self._initialized:
+            return None
+        now = time.monotonic()
+        ts, status = self._port_status
+        if status is not None and now - ts < self.PORT_STATUS_TTL:
+            return status
+        epoch = self._status_epoch
+        statuses = self.get_all_statuses(self._vmset_url, self._logger)
+        if statuses is not None and self.port_index in statuses:
+            status = statuses[self.port_index]
+        else:
+            # Fall back to querying the port alone
+            try:
+                status = self._get()
+            except Exception as e:
+                self.log_warning('Get {} failed, exception: {}'.format(self._url, repr(e)))
+                return None
+        if status is not None:
+            with self._status_lock:
+                # Do not cache a status read while a POST was changing it
+                if self._status_epoch == epoch:
+                    self._port_status = (now, status)
+        return status
+
     def _toggle_to(self, target):
         """
         Helper function for toggling active side of physical_port to target side.
+        In auto switching mode the toggle is posted from a background worker and True is returned
+        right away; toggles requested while one is still queued are coalesced into the latest target.
+        Otherwise the toggle is posted once the queued background toggle is done, so that it lands last.
+
+        Args:
+            target: UPPER_TOR / LOWER_TOR
+        Returns:
+            True if the toggle succeeded or was queued, False otherwise
+        """
+        if not self._initialized:
+            return False
+
+        if self.switching_mode != self.SWITCHING_MODE_AUTO:
+            with self._toggle_lock:
+                self._toggle_lock.wait_for(lambda: self._toggle_target is None)
+            return self._toggle_to_sync(target)
+
+        with self._toggle_lock:
+            queued = self._toggle_target is not None
+            self._toggle_target = target
+            if queued:
+                return True
+            self.mux_toggle_status = self.MUX_TOGGLE_STATUS_INPROGRESS
+        self._toggle_executor.submit(self._run_queued_toggle)
+        return True
+
+    def _run_queued_toggle(self):
+        target = None
+        with self._toggle_lock:
+            try:
+                # Stop once no new target was requested while posting the last one
+                while self._toggle_target != target:
+                    target = self._toggle_target
+                    self._toggle_lock.release()
+                    try:
+                        if not self._toggle_to_sync(target):
+                            self.log_warning('Background toggle of physical_port {} to {} failed'.format(self.port, target))
+                    except Exception as e:
+                        self.log_warning('Background toggle of physical_port {} to {} failed with {}'.format(
+                            self.port, target, repr(e)))
+                    finally:
+                        self._toggle_lock.acquire()
+            finally:
+                self._toggle_target = None
+                self.mux_toggle_status = self.MUX_TOGGLE_STATUS_NOT_INITIATED_OR_FINISHED
+                self._toggle_lock.notify_all()
+
+    def _toggle_to_sync(self, target):
+        """
+        Helper function for toggling active side of physical_port to target side and waiting for
+        the mux simulator to confirm it.
 
         Args:
             target: UPPER_TOR / LOWER_TOR
         Returns:
-            Latest mux status. None otherwise
+            True if the mux simulator reports target as the active side, False otherwise
         """
         self.log_notice("Toggle active side of physical_port {} to {}".format(self.port, target))
-        status = self._post(data={"active_side": target})  # mux simulator returns latest mux status
+        body = self._TOGGLE_BODIES.get(target)
+        if body is not None:
+            status = self._post(body=body)  # mux simulator returns latest mux status
+        else:
+            status = self._post(data={"active_side": target})
         if not status:
             return False
         if 'active_side' in status and status['active_side'] == target:
@@ -223,9 +522,8 @@ class YCable(YCableBase):
             return False
 
     def _clear_counter(self):
-        if self.port_index is not None:
-            self._post(url="{}/clear_flap_counter".format(self._vmset_url),
-                    data={'port_to_clear': str(self.port_index)})
+        if self._initialized and self.port_index is not None:
+            self._post(url=self._clear_counter_url, body=self._clear_counter_body)
 
     def toggle_mux_to_tor_a(self):
         """
@@ -279,7 +577,7 @@ class YCable(YCableBase):
         if not self._initialized:
             return self.TARGET_UNKNOWN
 
-        return self.TARGET_TOR_A if self.side == self.UPPER_TOR else self.TARGET_TOR_B
+        return self._read_side
 
     def get_mux_direction(self):
         """
@@ -301,15 +599,7 @@ class YCable(YCableBase):
         if not isinstance(status, dict):
             return self.TARGET_UNKNOWN
 
-        if 'active_side' in status:
-            if status['active_side'] == self.UPPER_TOR:
-                return self.TARGET_TOR_A
-            elif status['active_side'] == self.LOWER_TOR:
-                return self.TARGET_TOR_B
-            else:
-                return self.TARGET_UNKNOWN
-        else:
-            return self.TARGET_UNKNOWN
+        return self._SIDE_TO_TARGET.get(status.get('active_side'), self.TARGET_UNKNOWN)
 
     def get_active_linked_tor_side(self):
         """
@@ -443,7 +733,7 @@ class YCable(YCableBase):
         """
         # Currently the mux simulator only supports single flap counter. There is no difference between manual
         # flap, auto flap.
-        self.get_switch_count_total(clear_on_read=clear_on_read)//2
+        return self.get_switch_count_total(self.SWITCH_COUNT_MANUAL, clear_on_read=clear_on_read)//2
 
     def get_switch_count_tor_b(self, clear_on_read=False):
         """
@@ -463,7 +753,7 @@ class YCable(YCableBase):
         """
         # Currently the mux simulator only supports single flap counter. There is no difference between manual
         # flap, auto flap.
-        self.get_switch_count_total(clear_on_read=clear_on_read)//2
+        return self.get_switch_count_total(self.SWITCH_COUNT_MANUAL, clear_on_read=clear_on_read)//2
 
     def get_switch_count_target(self, switch_count_type, target, clear_on_read=False):
         """
@@ -490,7 +780,7 @@ class YCable(YCableBase):
         """
         # Currently the mux simulator only supports single flap counter. There is no difference between manual
         # flap, auto flap. There is also no dedicated counter for tor_a or tor_b.
-        self.get_switch_count_total(clear_on_read=clear_on_read)//2
+        return self.get_switch_count_total(switch_count_type, clear_on_read=clear_on_read)//2
 
     def get_target_cursor_values(self, lane, target):
         """
@@ -770,7 +1060,7 @@ class YCable(YCableBase):
             a boolean, True if the cable is alive
                      , False if the cable is not alive
         """
-        return False if self._get_status is None else True
+        return self._get_status() is not None
 
     def reset(self, target):
         """
@@ -789,7 +1079,7 @@ class YCable(YCableBase):
             a boolean, True if the cable is target reset
                      , False if the cable target is not reset
         """
-        return False if self._post('{}/reset'.format(self._url)) is None else True
+        return False if self._post(self._reset_url) is None else True
 
     def create_port(self, speed, fec_mode_tor=YCableBase.FEC_MODE_NONE, fec_mode_nic=YCableBase.FEC_MODE_NONE, anlt_tor=False, anlt_nic=False):
         """
@@ -1270,13 +1560,13 @@ class YCable(YCableBase):
                      EYE_PRBS_LOOPBACK_TARGET_TOR_B -> TOR B
                      EYE_PRBS_LOOPBACK_TARGET_NIC -> NIC
         Returns:
-            a list, with BER values of lane 0 lane 1 lane 2 lane 3 with corresponding index
+            a tuple, with BER values of lane 0 lane 1 lane 2 lane 3 with corresponding index
         """
 
         # Assume there are 4 lanes for simulated y-cable
-        return [0, 0, 0, 0]
+        return self._BER_ZEROS
 
-    def debug_dump_registers(self, option=None):
+    def debug_dump_registers(self, option=None, out=None):
         """
         This API should dump all registers with meaningful values
         for the cable to be diagnosed for proper functioning.
@@ -1292,7 +1582,10 @@ class YCable(YCableBase):
                  the registers, and thus provides more granularity for debugging/printing.
                  For example, the option can serdes_lane0, in this case the vendor would just dump
                  registers related to serdes lane 0.
-
+            out (optional):
+                 a Dictionary, if passed it is cleared, filled with the dump and returned instead of
+                 a new Dictionary, so that callers dumping repeatedly can reuse the same one.
+                 This parameter is specific to the simulated y-cable, it is not part of the YCableBase API.
 
         Returns:
             a Dictionary:
@@ -1300,4 +1593,7 @@ class YCable(YCableBase):
                  which would help diagnose the cable for proper functioning
         """
 
-        return {}
+        if out is None:
+            return {}
+        out.clear()
+        return out
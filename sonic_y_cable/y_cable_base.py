@@ -14,6 +14,9 @@
 
 class YCableBase():
 
+    # Subclasses without __slots__ still get a per-instance __dict__
+    __slots__ = ('port', '_logger', 'download_firmware_status', 'mux_toggle_status')
+
     # definitions of targets for getting the various fields/cursor
     # equalization parameters from the register spec.
     # the name of the target denotes which side MCU
@@ -92,6 +95,35 @@ class YCableBase():
     PRBS_DIRECTION_GENERATOR = 1
     PRBS_DIRECTION_CHECKER = 2
 
+    # definitions of optional capabilities, pollers can check them
+    # with supports() to skip the APIs a cable has nothing to report for
+    CAP_FEC_STATS = 0x01
+    CAP_PCS_STATS = 0x02
+    CAP_ANLT_STATS = 0x04
+    CAP_LOOPBACK = 0x08
+    CAP_DEBUG_REG = 0x10
+    CAP_ALL = CAP_FEC_STATS | CAP_PCS_STATS | CAP_ANLT_STATS | CAP_LOOPBACK | CAP_DEBUG_REG
+
+    # Bitmap of the CAP_* capabilities the cable implements
+    _CAPS = CAP_ALL
+
+    # Setting/getter APIs reachable through bulk_apply()/bulk_query(), by setting name
+    _BULK_SETTERS = {
+        'switching_mode': 'set_switching_mode',
+        'fec_mode': 'set_fec_mode',
+        'anlt': 'set_anlt',
+        'autoswitch_hysteresis_timer': 'set_autoswitch_hysteresis_timer',
+        'debug_mode': 'set_debug_mode',
+    }
+    _BULK_GETTERS = {
+        'switching_mode': 'get_switching_mode',
+        'fec_mode': 'get_fec_mode',
+        'anlt': 'get_anlt',
+        'autoswitch_hysteresis_timer': 'get_autoswitch_hysteresis_timer',
+        'debug_mode': 'get_debug_mode',
+        'loopback_mode': 'get_loopback_mode',
+    }
+
     def __init__(self, port, logger):
         """
         Args:
@@ -123,6 +155,27 @@ class YCableBase():
     def log_debug(self, msg):
         self._logger.log_debug("y_cable_port {}: {}".format(self.port, msg))
 
+    def supports(self, cap):
+        """
+        This API checks if the cable implements an optional capability, so that pollers can
+        decide once per port whether to poll the corresponding APIs at all.
+
+        Args:
+            cap:
+                 One of the following predefined constants, or a bitwise OR of them:
+                     CAP_FEC_STATS -> get_fec_stats
+                     CAP_PCS_STATS -> get_pcs_stats
+                     CAP_ANLT_STATS -> get_anlt_stats
+                     CAP_LOOPBACK -> get_loopback_mode
+                     CAP_DEBUG_REG -> debug_dump_registers
+
+        Returns:
+            a boolean, True if all the capabilities in cap are implemented
+                     , False otherwise
+        """
+
+        return self._CAPS & cap == cap
+
     def toggle_mux_to_tor_a(self):
         """
         This API does a hard switch toggle of the Y cable's MUX regardless of link state to
@@ -1136,7 +1189,7 @@ class YCableBase():
                      EYE_PRBS_LOOPBACK_TARGET_TOR_B -> TOR B
                      EYE_PRBS_LOOPBACK_TARGET_NIC -> NIC
         Returns:
-            a list, with BER values of lane 0 lane 1 lane 2 lane 3 with corresponding index
+            a list or tuple, with BER values of lane 0 lane 1 lane 2 lane 3 with corresponding index
         """
 
         raise NotImplementedError
@@ -1297,3 +1350,50 @@ class YCableBase():
         """
 
         raise NotImplementedError
+
+    def bulk_apply(self, ops):
+        """
+        This API applies several settings on the cable in one call.
+        The default implementation calls the individual set_* APIs in order; vendors whose
+        transport allows it should override it to coalesce the settings into a single transaction.
+        The port on which this API is called for can be referred using self.port.
+
+        Args:
+            ops:
+                 a list of (name, args) tuples, where name is one of
+                 'switching_mode', 'fec_mode', 'anlt', 'autoswitch_hysteresis_timer', 'debug_mode'
+                 and args is the tuple of arguments of the corresponding set_* API,
+                 for example ('fec_mode', (FEC_MODE_RS, TARGET_NIC)).
+                 A KeyError is raised for an unknown name, before any setting is applied
+
+        Returns:
+            a list of Booleans, the result of each setting in the order of ops
+        """
+
+        setters = [getattr(self, self._BULK_SETTERS[name]) for name, _ in ops]
+        results = [False] * len(ops)
+        for i, (setter, (_, args)) in enumerate(zip(setters, ops)):
+            results[i] = setter(*args)
+        return results
+
+    def bulk_query(self, keys):
+        """
+        This API reads several settings from the cable in one call.
+        The default implementation calls the individual get_* APIs; vendors whose
+        transport allows it should override it to coalesce the reads into a single transaction.
+        The port on which this API is called for can be referred using self.port.
+
+        Args:
+            keys:
+                 a list of (name, args) tuples, where name is one of
+                 'switching_mode', 'fec_mode', 'anlt', 'autoswitch_hysteresis_timer', 'debug_mode',
+                 'loopback_mode' and args is the tuple of arguments of the corresponding get_* API,
+                 for example ('fec_mode', (TARGET_NIC,)).
+                 A KeyError is raised for an unknown name, before any getter is called
+
+        Returns:
+            a Dictionary, mapping each key to the value returned by the corresponding get_* API
+        """
+
+        getters = [getattr(self, self._BULK_GETTERS[name]) for name, _ in keys]
+        return {key: getter(*key[1]) for getter, key in zip(getters, keys)}
@@ -4,6 +4,7 @@ Test Sensor_fs module
 
 import yaml
 import os
+import time
 from unittest import mock
 from sonic_platform_base.sensor_fs import VoltageSensorFs
 from sonic_platform_base.sensor_fs import CurrentSensorFs
@@ -81,3 +82,85 @@ class TestSensorFs:
         assert(vsensors[0].get_value() == 900)
         assert(vsensors[0].get_minimum_recorded() == 900)
         assert(vsensors[0].get_maximum_recorded() == 900)
+
+    @staticmethod
+    def test_sensor_fs_cached_fd(tmp_path):
+        '''
+        Test sensor reads through the cached file descriptor
+        '''
+        sensor_file = tmp_path / "VSENSOR3"
+        sensor_file.write_text("1000\n")
+
+        vsensor = VoltageSensorFs(name='VSENSOR3', sensor=str(sensor_file), ttl=0)
+        assert(vsensor.get_value() == 1000)
+        fd = vsensor._fd
+        assert(fd is not None)
+
+        sensor_file.write_text("1100\n")
+        assert(vsensor.get_value() == 1100)
+        assert(vsensor._fd == fd)
+
+        vsensor.close()
+        assert(vsensor._fd is None)
+        assert(vsensor.get_value() == 1100)
+
+    @staticmethod
+    def test_sensor_fs_ttl(tmp_path):
+        '''
+        Test sensor readings are reused within the TTL
+        '''
+        sensor_file = tmp_path / "CSENSOR3"
+        sensor_file.write_text("500\n")
+
+        csensor = CurrentSensorFs(name='CSENSOR3', sensor=str(sensor_file), ttl=60)
+        sensor_file.write_text("600\n")
+        assert(csensor.get_value() == 500)
+        assert(csensor.get_maximum_recorded() == 500)
+
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 120):
+            assert(csensor.get_value() == 600)
+            assert(csensor.get_maximum_recorded() == 600)
+            assert(csensor.get_minimum_recorded() == 500)
+
+    @staticmethod
+    def test_sensor_fs_polling(tmp_path):
+        '''
+        Test sensor readings published by the background poller
+        '''
+        sensor_file = tmp_path / "VSENSOR4"
+        sensor_file.write_text("700\n")
+
+        vsensor = VoltageSensorFs(name='VSENSOR4', sensor=str(sensor_file), ttl=0)
+        VoltageSensorFs.start_polling(0.01)
+        try:
+            assert(vsensor._latest == 700)
+            sensor_file.write_text("750\n")
+            deadline = time.monotonic() + 5
+            while vsensor.get_value() != 750 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert(vsensor.get_value() == 750)
+        finally:
+            VoltageSensorFs.stop_polling()
+
+        assert(vsensor._latest is None)
+        sensor_file.write_text("800\n")
+        assert(vsensor.get_value() == 800)
+
+    @staticmethod
+    def test_sensor_fs_read_many(tmp_path):
+        '''
+        Test batched sensor reads
+        '''
+        vsensor_file = tmp_path / "VSENSOR5"
+        vsensor_file.write_text("1200\n")
+        csensor_file = tmp_path / "CSENSOR5"
+        csensor_file.write_text("300\n")
+
+        vsensor = VoltageSensorFs(name='VSENSOR5', sensor=str(vsensor_file))
+        csensor = CurrentSensorFs(name='CSENSOR5', sensor=str(csensor_file))
+        missing = CurrentSensorFs(name='CSENSOR6', sensor=str(tmp_path / "CSENSOR6"))
+
+        vsensor_file.write_text("1250\n")
+        values = VoltageSensorFs.read_many([vsensor, csensor, missing])
+        assert(values == {vsensor: 1250, csensor: 300, missing: None})
+        assert(vsensor.get_value() == 1250)
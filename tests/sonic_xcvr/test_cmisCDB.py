@@ -1,4 +1,4 @@
-from mock import MagicMock
+from mock import MagicMock, patch
 import pytest
 from sonic_platform_base.sonic_xcvr.api.public.cmis import CmisApi
 from sonic_platform_base.sonic_xcvr.api.public.cmisCDB import CmisCdbApi
@@ -36,14 +36,47 @@ class TestCDB(object):
         result = self.api.cdb1_chkflags()
         assert result == expected
 
+    def test_cdb1_wait_complete_backoff(self):
+        api = CmisCdbApi(self.eeprom)
+        api.cdb1_chkflags = MagicMock(side_effect=[True] * 6 + [False])
+        with patch('time.sleep') as mock_sleep:
+            assert api.cdb1_wait_complete()
+        delays = [call[0][0] for call in mock_sleep.call_args_list]
+        assert delays == [0.01, 0.02, 0.04, 0.08, 0.16, 0.2]
+
+    def test_cdb1_wait_complete_timeout(self):
+        api = CmisCdbApi(self.eeprom)
+        api.cdb1_chkflags = MagicMock(return_value=True)
+        with patch('time.sleep'), patch('time.monotonic', side_effect=[0, 1, 61]):
+            assert not api.cdb1_wait_complete()
+        assert api.cdb1_chkflags.call_count == 2
+
+    def test_cdb1_wait_complete_fault(self):
+        api = CmisCdbApi(self.eeprom)
+        api.cdb1_chkflags = MagicMock(side_effect=AssertionError)
+        with pytest.raises(AssertionError):
+            api.cdb1_wait_complete()
+
 
     @pytest.mark.parametrize("input_param, expected", [
-        (bytearray(b'\x00'), 255)
+        (bytearray(b'\x00'), 255),
+        (bytearray(b'\x01\x01\x00\x00\x00\x00\x00\x00'), 253),
+        (bytearray(b'\xff' * 2048), 255),
+        ((0, 7, 112, 255, 255, 16), 122),
     ])
     def test_cdb_chkcode(self, input_param, expected):
         result = self.api.cdb_chkcode(input_param)
         assert result == expected
 
+    @pytest.mark.parametrize("template", [
+        CmisCdbApi._CMD_0000, CmisCdbApi._CMD_0040, CmisCdbApi._CMD_0041, CmisCdbApi._CMD_0100,
+        CmisCdbApi._CMD_0102, CmisCdbApi._CMD_0107, CmisCdbApi._CMD_010A,
+    ])
+    def test_cmd_template_chkcode(self, template):
+        cmd = bytearray(template)
+        cmd[5] = 0
+        assert template[5] == self.api.cdb_chkcode(cmd)
+
     @pytest.mark.parametrize("mock_response, expected", [
         ([1], 1),
         ([128,128,1], 1)
@@ -54,6 +87,66 @@ class TestCDB(object):
         result = self.api.cdb1_chkstatus()
         assert result == expected
 
+    def test_cdb1_chkstatus_backoff(self):
+        self.api.xcvr_eeprom.read = MagicMock()
+        self.api.xcvr_eeprom.read.side_effect = [128] * 8 + [1]
+        with patch('time.sleep') as mock_sleep:
+            result = self.api.cdb1_chkstatus()
+        assert result == 1
+        delays = [call[0][0] for call in mock_sleep.call_args_list]
+        assert delays == [0.005, 0.01, 0.02, 0.04, 0.08, 0.16, 0.2, 0.2]
+
+    def test_cdb1_chkstatus_timeout(self):
+        self.api.xcvr_eeprom.read = MagicMock(return_value=None)
+        with patch('time.sleep'), patch('time.monotonic', side_effect=[0, 1, 2, 61]):
+            result = self.api.cdb1_chkstatus()
+        assert result is None
+        assert self.api.xcvr_eeprom.read.call_count == 3
+
+    @pytest.mark.parametrize("mock_response, expected", [
+        (1, 'Test status: Success'),
+        (5, 'Test status: Fail- '),
+        (128, 'Test status: Busy'),
+    ])
+    def test_issue_cdb(self, mock_response, expected):
+        api = CmisCdbApi(self.eeprom)
+        calls = MagicMock()
+        api.write_cdb = calls.write_cdb
+        api.cdb1_wait_complete = calls.cdb1_wait_complete
+        api.cdb1_chkstatus = calls.cdb1_chkstatus
+        api.cdb1_wait_complete.return_value = True
+        api.cdb1_chkstatus.return_value = mock_response
+        with patch('sonic_platform_base.sonic_xcvr.api.public.cmisCDB.logger') as mock_logger:
+            result = api._issue_cdb(bytearray(8), 'Test')
+        assert result == mock_response
+        # The status is only read once the command is flagged complete
+        assert [c[0] for c in calls.mock_calls] == ['write_cdb', 'cdb1_wait_complete', 'cdb1_chkstatus']
+        # Both waits share one deadline
+        assert calls.cdb1_wait_complete.call_args == calls.cdb1_chkstatus.call_args
+        args = mock_logger.info.call_args[0]
+        assert (args[0] % args[1:]).startswith(expected)
+
+    def test_issue_cdb_timeout(self):
+        api = CmisCdbApi(self.eeprom)
+        api.write_cdb = MagicMock()
+        api.cdb1_wait_complete = MagicMock(return_value=False)
+        api.cdb1_chkstatus = MagicMock(return_value=128)
+        with patch('sonic_platform_base.sonic_xcvr.api.public.cmisCDB.logger') as mock_logger:
+            assert api._issue_cdb(bytearray(8), 'Test') == 128
+        args = mock_logger.warning.call_args[0]
+        assert 'timed out' in args[0] % args[1:]
+
+    def test_issue_cdb_firmware_fault(self):
+        api = CmisCdbApi(self.eeprom)
+        api.write_cdb = MagicMock()
+        api.cdb1_chkflags = MagicMock(side_effect=AssertionError)
+        api.cdb1_chkstatus = MagicMock(return_value=1)
+        with patch('sonic_platform_base.sonic_xcvr.api.public.cmisCDB.logger') as mock_logger:
+            with pytest.raises(AssertionError):
+                api._issue_cdb(bytearray(8), 'Test')
+        mock_logger.error.assert_called_once()
+        api.cdb1_chkstatus.assert_not_called()
+
     @pytest.mark.parametrize("mock_response, expected", [
         (
             [18, 35, (0, 7, 112, 255, 255, 16, 0, 0, 19, 136, 0, 100, 3, 232, 19, 136, 58, 152)],
@@ -74,6 +167,7 @@ class TestCDB(object):
         ([128, (None, None, None)], (None, None, None)),
     ])
     def test_query_cdb_status(self, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response[0]
         self.api.read_cdb = MagicMock()
@@ -87,6 +181,7 @@ class TestCDB(object):
         (128, 128),
     ])
     def test_module_enter_password(self, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.module_enter_password()
@@ -98,6 +193,7 @@ class TestCDB(object):
         ([128, (None, None, None)], (None, None, None)),
     ])
     def test_get_module_feature(self, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response[0]
         self.api.read_cdb = MagicMock()
@@ -111,6 +207,7 @@ class TestCDB(object):
         ([128, (None, None, None)], (None, None, None)),
     ])
     def test_get_fw_management_features(self, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response[0]
         self.api.read_cdb = MagicMock()
@@ -124,6 +221,7 @@ class TestCDB(object):
         ([128, (None, None, None)], (None, None, None)),
     ])
     def test_get_fw_info(self, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response[0]
         self.api.read_cdb = MagicMock()
@@ -137,6 +235,7 @@ class TestCDB(object):
         ([3, bytearray(b'\x00\x00\x00'), 1000000], 128, 128),
     ])
     def test_start_fw_download(self, input_param, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.start_fw_download(*input_param)
@@ -148,6 +247,7 @@ class TestCDB(object):
         (128, 128),
     ])
     def test_abort_fw_download(self, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.abort_fw_download()
@@ -159,17 +259,45 @@ class TestCDB(object):
         ([100, bytearray(116)], 128, 128),
     ])
     def test_block_write_lpl(self, input_param, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.block_write_lpl(*input_param)
         assert result == expected
 
+    def test_block_write_lpl_cmd(self):
+        eeprom = XcvrEeprom(MagicMock(return_value=None), MagicMock(), self.mem_map)
+        api = CmisCdbApi(eeprom)
+        api.xcvr_eeprom.write_raw = MagicMock()
+        api.cdb1_wait_complete = MagicMock(return_value=True)
+        api.cdb1_chkstatus = MagicMock(return_value=1)
+        api.block_write_lpl(0x01020304, bytearray(b'\xaa' * 116))
+        body_call, header_call = api.xcvr_eeprom.write_raw.call_args_list
+        body = body_call[0][2]
+        assert body_call[0][0] == 0x9f * 128 + 130 and body_call[0][1] == 126
+        assert body[:10] == bytearray(b'\x00\x00\x78\x71\x00\x00\x01\x02\x03\x04')
+        assert header_call[0] == (0x9f * 128 + 128, 2, bytearray(b'\x01\x03'))
+
+    def test_block_write_epl_chunks(self):
+        eeprom = XcvrEeprom(MagicMock(return_value=None), MagicMock(), self.mem_map)
+        api = CmisCdbApi(eeprom)
+        api.xcvr_eeprom.write_raw = MagicMock()
+        api.cdb1_wait_complete = MagicMock(return_value=True)
+        api.cdb1_chkstatus = MagicMock(return_value=1)
+        data = bytes(range(256)) + b'\x55' * 44
+        api.block_write_epl(0, data, False, 0)
+        calls = [call[0] for call in api.xcvr_eeprom.write_raw.call_args_list]
+        assert [(offset, size) for offset, size, _ in calls[:3]] == \
+            [(0xa0 * 128 + 128, 128), (0xa1 * 128 + 128, 128), (0xa2 * 128 + 128, 44)]
+        assert b''.join(bytes(chunk) for _, _, chunk in calls[:3]) == data
+
     @pytest.mark.parametrize("input_param, mock_response, expected", [
         ([100, bytearray(2048), True, 100], 1, 1),
         ([100, bytearray(2047), False, 100], 64, 64),
         ([100, bytearray(2047), False, 100], 128, 128),
     ])
     def test_block_write_epl(self, input_param, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.block_write_epl(*input_param)
@@ -181,6 +309,7 @@ class TestCDB(object):
         (128, 128),
     ])
     def test_validate_fw_image(self, mock_response, expected):
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.validate_fw_image()
@@ -194,6 +323,7 @@ class TestCDB(object):
     def test_run_fw_image(self, mock_response, expected):
         self.api.module_enter_password = MagicMock()
         self.api.module_enter_password.return_value = 1
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.run_fw_image()
@@ -207,6 +337,7 @@ class TestCDB(object):
     def test_commit_fw_image(self, mock_response, expected):
         self.api.module_enter_password = MagicMock()
         self.api.module_enter_password.return_value = 1
+        self.api.cdb1_wait_complete = MagicMock(return_value=True)
         self.api.cdb1_chkstatus = MagicMock()
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.commit_fw_image()
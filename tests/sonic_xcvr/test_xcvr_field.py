@@ -153,6 +153,7 @@ class TestXcvrField(object):
             "NestedField1": mem_map.get_field("NestedField1"),
             "NestedField2": mem_map.get_field("NestedField2")
         }
+        assert field.get_fields() is fields
 
 class TestRegBitsField(object):
     def test_encode_decode(self):
@@ -248,6 +249,12 @@ class TestRegField(object):
         field = mem_map.get_field("Field0")
         assert not field.read_before_write()
 
+    def test_get_bitmask(self):
+        assert mem_map.get_field("Field0").get_bitmask() is None
+        assert mem_map.get_field("Field1").get_bitmask() == 0x3
+        assert mem_map.get_field("ShiftedCodeReg").get_bitmask() == 0x180
+        assert mem_map.get_field("MultiBitsReg2").get_bitmask() == 0xff
+
 class TestNumberRegField(object):
     def test_encode_decode(self):
         field = mem_map.get_field("NumReg")
@@ -299,6 +306,8 @@ class TestHexRegField(object):
         field = mem_map.get_field("HexReg")
         data = bytearray([0xAA, 0xBB, 0xCC])
         assert field.decode(data) == "aa-bb-cc"
+        assert field.decode(bytearray([0x01])) == "01"
+        assert field.decode(bytearray()) == ""
 
 class TestServerFWVersionRegField(object):
     def test_decode(self):
@@ -357,6 +366,12 @@ class TestRegGroupField(object):
             "Field4": 0x01040302,
         }
 
+        decoded = field.decode(memoryview(data))
+        assert decoded == {
+            "Field3": 0x04030201,
+            "Field4": 0x01040302,
+        }
+
 class TestDateField(object):
     def test_decode(self):
         field = mem_map.get_field("Date")
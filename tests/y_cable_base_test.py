@@ -0,0 +1,90 @@
+'''
+Test the YCableBase batch and capability APIs
+'''
+
+import pytest
+from mock import MagicMock
+from sonic_y_cable.y_cable_base import YCableBase
+
+
+class BulkYCable(YCableBase):
+    def __init__(self):
+        YCableBase.__init__(self, 1, MagicMock())
+        self.fec_mode = {}
+        self.switching_mode = YCableBase.SWITCHING_MODE_MANUAL
+
+    def set_fec_mode(self, fec_mode, target):
+        self.fec_mode[target] = fec_mode
+        return True
+
+    def get_fec_mode(self, target):
+        return self.fec_mode.get(target, self.FEC_MODE_NONE)
+
+    def set_switching_mode(self, mode):
+        self.switching_mode = mode
+        return True
+
+    def get_switching_mode(self):
+        return self.switching_mode
+
+    def set_anlt(self, enable, target):
+        return False
+
+
+class TestYCableBase:
+
+    def test_bulk_apply(self):
+        cable = BulkYCable()
+        results = cable.bulk_apply([
+            ('fec_mode', (YCableBase.FEC_MODE_RS, YCableBase.TARGET_NIC)),
+            ('switching_mode', (YCableBase.SWITCHING_MODE_AUTO,)),
+            ('anlt', (True, YCableBase.TARGET_NIC)),
+        ])
+        assert results == [True, True, False]
+        assert cable.fec_mode == {YCableBase.TARGET_NIC: YCableBase.FEC_MODE_RS}
+        assert cable.switching_mode == YCableBase.SWITCHING_MODE_AUTO
+
+    def test_bulk_query(self):
+        cable = BulkYCable()
+        cable.fec_mode[YCableBase.TARGET_TOR_A] = YCableBase.FEC_MODE_RS
+        keys = [
+            ('fec_mode', (YCableBase.TARGET_TOR_A,)),
+            ('fec_mode', (YCableBase.TARGET_NIC,)),
+            ('switching_mode', ()),
+        ]
+        assert cable.bulk_query(keys) == {
+            keys[0]: YCableBase.FEC_MODE_RS,
+            keys[1]: YCableBase.FEC_MODE_NONE,
+            keys[2]: YCableBase.SWITCHING_MODE_MANUAL,
+        }
+
+    def test_bulk_apply_unknown_name(self):
+        cable = BulkYCable()
+        with pytest.raises(KeyError):
+            cable.bulk_apply([('switching_mode', (YCableBase.SWITCHING_MODE_AUTO,)), ('no_such_setting', (1,))])
+        # Nothing is applied when the batch is rejected
+        assert cable.switching_mode == YCableBase.SWITCHING_MODE_MANUAL
+
+    def test_bulk_query_unknown_name(self):
+        with pytest.raises(KeyError):
+            BulkYCable().bulk_query([('switching_mode', ()), ('no_such_setting', ())])
+
+    def test_bulk_unimplemented_api(self):
+        with pytest.raises(NotImplementedError):
+            BulkYCable().bulk_query([('debug_mode', ())])
+
+    def test_supports_all_by_default(self):
+        cable = BulkYCable()
+        for cap in (YCableBase.CAP_FEC_STATS, YCableBase.CAP_PCS_STATS, YCableBase.CAP_ANLT_STATS,
+                    YCableBase.CAP_LOOPBACK, YCableBase.CAP_DEBUG_REG, YCableBase.CAP_ALL):
+            assert cable.supports(cap)
+
+    def test_supports_mask(self):
+        cable = BulkYCable()
+        cable._CAPS = YCableBase.CAP_FEC_STATS | YCableBase.CAP_LOOPBACK
+        assert cable.supports(YCableBase.CAP_FEC_STATS)
+        assert cable.supports(YCableBase.CAP_FEC_STATS | YCableBase.CAP_LOOPBACK)
+        assert not cable.supports(YCableBase.CAP_PCS_STATS)
+        # All of the OR-ed capabilities are required
+        assert not cable.supports(YCableBase.CAP_FEC_STATS | YCableBase.CAP_PCS_STATS)
+        assert not cable.supports(YCableBase.CAP_ALL)
@@ -0,0 +1,489 @@
+'''
+Test the simulated y-cable driver against a local fake mux simulator
+'''
+
+import http.client
+import http.server
+import json
+import os
+import threading
+import time
+import pytest
+from mock import MagicMock, patch
+from sonic_y_cable.microsoft import y_cable_simulated
+from sonic_y_cable.microsoft.y_cable_simulated import YCable, _HttpConnectionPool
+
+VM_SET = 'vms-t0'
+NUM_PORTS = 4
+
+
+class FakeMuxSimulatorHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        server = self.server
+        server.clients.add(self.client_address)
+        server.requests.append((method, self.path))
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length)) if length else None
+        if server.fail_next > 0:
+            server.fail_next -= 1
+            return self._reply(500, {'err_msg': 'injected failure'})
+
+        parts = self.path.strip('/').split('/')  # ['mux', vm_set] or ['mux', vm_set, port_index]
+        if len(parts) == 2:
+            return self._reply(200, {str(i): s for i, s in server.statuses.items()})
+        if method == 'GET':
+            return self._reply(200, server.statuses[int(parts[2])])
+        if parts[2] == 'clear_flap_counter':
+            server.statuses[int(data['port_to_clear'])]['flap_counter'] = 0
+            return self._reply(200, server.statuses[int(data['port_to_clear'])])
+        port_index = int(parts[2])
+        # Hold the POST until the test lets it through, the mux status only changes on reply
+        server.post_received.set()
+        server.post_gate.wait(5)
+        status = server.statuses[port_index]
+        if len(parts) == 3 and data and 'active_side' in data:
+            if data['active_side'] != status['active_side']:
+                status['flap_counter'] += 1
+            status['active_side'] = data['active_side']
+        return self._reply(200, status)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+
+@pytest.fixture
+def mux_simulator():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FakeMuxSimulatorHandler)
+    server.daemon_threads = True
+    server.statuses = {i: {'port_index': i, 'active_side': YCable.UPPER_TOR, 'flap_counter': 0}
+                       for i in range(NUM_PORTS)}
+    server.requests = []
+    server.clients = set()
+    server.fail_next = 0
+    server.post_received = threading.Event()
+    server.post_gate = threading.Event()
+    server.post_gate.set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.post_gate.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_cable(mux_simulator, tmp_path):
+    config = tmp_path / 'mux_simulator.json'
+    config.write_text(json.dumps({
+        'server_ip': '127.0.0.1',
+        'server_port': mux_simulator.server_address[1],
+        'vm_set': VM_SET,
+        'side': YCable.UPPER_TOR,
+    }))
+    # Physical ports 1..NUM_PORTS are logical ports 0..NUM_PORTS-1
+    ports = {'Ethernet{}'.format(i * 4): {'index': str(i + 1), 'speed': '100000'} for i in range(NUM_PORTS)}
+    YCable._status_cache.clear()
+    y_cable_simulated._get_sorted_ports.cache_clear()
+    y_cable_simulated._build_port_index_map.cache_clear()
+    with patch.object(YCable, 'MUX_SIMULATOR_CONFIG_FILE', str(config)), \
+            patch.object(YCable, 'POLL_INTERVAL', 0), \
+            patch.object(y_cable_simulated, 'device_info') as mock_device_info, \
+            patch.object(y_cable_simulated, 'get_port_config', return_value=(ports, None, None)):
+        mock_device_info.get_platform_and_hwsku.return_value = ('x86_64-kvm_x86_64-r0', 'Force10-S6000')
+        yield lambda port: YCable(port, MagicMock())
+    y_cable_simulated._get_sorted_ports.cache_clear()
+    y_cable_simulated._build_port_index_map.cache_clear()
+    YCable._status_cache.clear()
+
+
+class TestHttpConnectionPool:
+
+    def test_reuses_connection(self, mux_simulator):
+        pool = _HttpConnectionPool()
+        url = 'http://127.0.0.1:{}/mux/{}/1'.format(mux_simulator.server_address[1], VM_SET)
+        for _ in range(3):
+            status, data = pool.request('GET', url, timeout=5)
+            assert status == 200
+            assert json.loads(data)['port_index'] == 1
+        assert len(mux_simulator.clients) == 1
+
+    def test_retries_stale_connection(self, mux_simulator):
+        pool = _HttpConnectionPool()
+        host, port = mux_simulator.server_address
+        stale = MagicMock(sock=None)
+        stale.request.side_effect = http.client.RemoteDisconnected('closed while idle')
+        pool._idle[(host, port)] = [stale]
+        status, _ = pool.request('GET', 'http://{}:{}/mux/{}/0'.format(host, port, VM_SET), timeout=5)
+        assert status == 200
+        stale.close.assert_called_once()
+        assert len(mux_simulator.requests) == 1
+
+    def test_fresh_connection_failure_is_raised(self):
+        pool = _HttpConnectionPool()
+        conn = MagicMock()
+        conn.request.side_effect = ConnectionResetError
+        with patch('http.client.HTTPConnection', return_value=conn) as mock_conn:
+            with pytest.raises(ConnectionResetError):
+                pool.request('GET', 'http://127.0.0.1:1/mux/{}/0'.format(VM_SET), timeout=5)
+        mock_conn.assert_called_once()
+        conn.close.assert_called_once()
+
+    def test_get_retries_error_status(self, mux_simulator, make_cable):
+        cable = make_cable(2)
+        mux_simulator.fail_next = 1
+        status = cable._get()
+        assert status['port_index'] == 1
+        assert len(mux_simulator.requests) == 2
+        assert 'HTTP status 500' in cable._logger.log_warning.call_args_list[0][0][0]
+
+
+class TestMuxSimulatorConfig:
+
+    def test_config_parsed_once(self, make_cable):
+        y_cable_simulated._load_mux_simulator_config.cache_clear()
+        cable_1, cable_2 = make_cable(1), make_cable(2)
+        assert cable_1._vmset_url == cable_2._vmset_url
+        info = y_cable_simulated._load_mux_simulator_config.cache_info()
+        assert (info.misses, info.hits) == (1, 1)
+
+    def test_edited_config_reloaded(self, make_cable):
+        y_cable_simulated._load_mux_simulator_config.cache_clear()
+        assert make_cable(1)._vmset_url.endswith('/mux/{}'.format(VM_SET))
+        path = YCable.MUX_SIMULATOR_CONFIG_FILE
+        with open(path) as f:
+            config = json.load(f)
+        config['vm_set'] = 'vms-t1'
+        with open(path, 'w') as f:
+            json.dump(config, f)
+        mtime = os.path.getmtime(path) + 1
+        os.utime(path, (mtime, mtime))
+        assert make_cable(1)._vmset_url.endswith('/mux/vms-t1')
+
+
+class TestPortIndex:
+
+    def test_port_config_read_once(self, make_cable):
+        cables = [make_cable(port) for port in range(1, NUM_PORTS + 1)]
+        assert [cable.port_index for cable in cables] == list(range(NUM_PORTS))
+        assert [cable.port_speed for cable in cables] == [100000] * NUM_PORTS
+        y_cable_simulated.get_port_config.assert_called_once_with('Force10-S6000', 'x86_64-kvm_x86_64-r0')
+
+    def test_natural_order_and_first_interface_wins(self, make_cable):
+        # Breakout: physical port 1 has two interfaces, Ethernet10 would sort before Ethernet2 lexically
+        y_cable_simulated.get_port_config.return_value = ({
+            'Ethernet10': {'index': '3', 'speed': '100000'},
+            'Ethernet2': {'index': '2', 'speed': '40000'},
+            'Ethernet1': {'index': '1', 'speed': '10000'},
+            'Ethernet0': {'index': '1', 'speed': '25000'},
+        }, None, None)
+        cables = {port: make_cable(port) for port in (1, 2, 3)}
+        assert {port: cable.port_index for port, cable in cables.items()} == {1: 0, 2: 2, 3: 3}
+        assert {port: cable.port_speed for port, cable in cables.items()} == {1: 25000, 2: 40000, 3: 100000}
+
+    def test_unknown_port(self, make_cable):
+        cable = make_cable(NUM_PORTS + 1)
+        assert cable.port_index is None
+        assert 'Failed to find index of physical port' in cable._logger.log_error.call_args_list[0][0][0]
+
+
+class TestVmSetStatuses:
+
+    @staticmethod
+    def vmset_url(mux_simulator):
+        return 'http://127.0.0.1:{}/mux/{}'.format(mux_simulator.server_address[1], VM_SET)
+
+    def test_snapshot_by_port_index(self, mux_simulator, make_cable):
+        cables = [make_cable(port) for port in range(1, NUM_PORTS + 1)]
+        statuses = YCable.get_all_statuses(self.vmset_url(mux_simulator))
+        assert sorted(statuses) == list(range(NUM_PORTS))
+        assert [cable._get_status()['port_index'] for cable in cables] == list(range(NUM_PORTS))
+        assert mux_simulator.requests == [('GET', '/mux/{}'.format(VM_SET))]
+
+    def test_missing_port_falls_back_to_port_get(self, mux_simulator, make_cable):
+        cable = make_cable(4)
+        del mux_simulator.statuses[3]['port_index']
+        status = cable._get_status()
+        assert status['active_side'] == YCable.UPPER_TOR
+        assert mux_simulator.requests == [('GET', '/mux/{}'.format(VM_SET)), ('GET', '/mux/{}/3'.format(VM_SET))]
+
+    def test_failed_snapshot_falls_back_to_port_get(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        mux_simulator.fail_next = 1
+        assert cable._get_status()['port_index'] == 0
+        assert mux_simulator.requests == [('GET', '/mux/{}'.format(VM_SET)), ('GET', '/mux/{}/0'.format(VM_SET))]
+        assert 'HTTP status 500' in cable._logger.log_warning.call_args_list[0][0][0]
+
+    def test_gather_statuses(self, mux_simulator, make_cable):
+        cables = [make_cable(port) for port in (4, 1, 3)]
+        uninitialized = make_cable(2)
+        uninitialized._initialized = False
+        statuses = YCable.gather_statuses(cables[:2] + [uninitialized] + cables[2:])
+        assert [status and status['port_index'] for status in statuses] == [3, 0, None, 2]
+        # One snapshot for the vm_set, no per-port request
+        assert mux_simulator.requests == [('GET', '/mux/{}'.format(VM_SET))]
+
+    def test_gather_statuses_per_vm_set(self, mux_simulator, make_cable):
+        cables = [make_cable(port) for port in range(1, NUM_PORTS + 1)]
+        for cable in cables[2:]:
+            cable._vmset_url = cable._vmset_url.replace(VM_SET, 'vms-t1')
+        assert all(YCable.gather_statuses(cables))
+        assert sorted(mux_simulator.requests) == [('GET', '/mux/vms-t0'), ('GET', '/mux/vms-t1')]
+
+    def test_gather_statuses_empty(self, mux_simulator):
+        assert YCable.gather_statuses([]) == []
+        assert YCable.gather_statuses(iter([])) == []
+        assert mux_simulator.requests == []
+
+    def test_snapshot_keyed_by_port_index(self, mux_simulator, make_cable):
+        cable = make_cable(3)
+        for status in mux_simulator.statuses.values():
+            del status['port_index']
+        assert sorted(YCable.get_all_statuses(self.vmset_url(mux_simulator))) == list(range(NUM_PORTS))
+        assert cable._get_status()['active_side'] == YCable.UPPER_TOR
+        assert mux_simulator.requests == [('GET', '/mux/{}'.format(VM_SET))]
+
+    def test_empty_snapshot_not_cached(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        url = self.vmset_url(mux_simulator)
+        mux_simulator.statuses.clear()
+        logger = MagicMock()
+        assert YCable.get_all_statuses(url, logger) is None
+        assert url not in YCable._status_cache
+        assert 'no mux status' in logger.log_warning.call_args[0][0]
+
+    def test_snapshot_ttl(self, mux_simulator, make_cable):
+        url = self.vmset_url(mux_simulator)
+        YCable.get_all_statuses(url)
+        YCable.get_all_statuses(url)
+        assert len(mux_simulator.requests) == 1
+        ts, statuses = YCable._status_cache[url]
+        YCable._status_cache[url] = (ts - YCable.STATUS_CACHE_TTL, statuses)
+        YCable.get_all_statuses(url)
+        assert len(mux_simulator.requests) == 2
+
+    def test_snapshot_dropped_on_post(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        url = self.vmset_url(mux_simulator)
+        YCable.get_all_statuses(url)
+        assert cable._toggle_to_sync(YCable.LOWER_TOR)
+        assert url not in YCable._status_cache
+        assert YCable.get_all_statuses(url)[0]['active_side'] == YCable.LOWER_TOR
+
+    def test_snapshot_fetched_across_post_not_cached(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        url = self.vmset_url(mux_simulator)
+        request = y_cable_simulated._connection_pool.request
+
+        def request_racing_post(*args, **kwargs):
+            result = request(*args, **kwargs)
+            cable.invalidate_cache()  # A POST to the vm_set started while the snapshot was in flight
+            return result
+
+        with patch.object(y_cable_simulated._connection_pool, 'request', side_effect=request_racing_post):
+            assert YCable.get_all_statuses(url) is not None
+        assert url not in YCable._status_cache
+
+
+class TestPortStatus:
+
+    def test_port_status_ttl(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        cable.get_mux_direction()
+        YCable._status_cache.clear()
+        cable.get_alive_status()
+        assert len(mux_simulator.requests) == 1
+        ts, status = cable._port_status
+        cable._port_status = (ts - YCable.PORT_STATUS_TTL, status)
+        YCable._status_cache.clear()
+        cable.get_alive_status()
+        assert len(mux_simulator.requests) == 2
+
+    def test_direction_read_during_toggle(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        mux_simulator.post_gate.clear()
+        toggle = threading.Thread(target=cable.toggle_mux_to_tor_b)
+        toggle.start()
+        assert mux_simulator.post_received.wait(5)
+        # The simulator has not applied the toggle yet
+        assert cable.get_mux_direction() == YCable.TARGET_TOR_A
+        mux_simulator.post_gate.set()
+        toggle.join(5)
+        assert cable.get_mux_direction() == YCable.TARGET_TOR_B
+
+    def test_status_read_across_post_not_cached(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        stale = {0: dict(mux_simulator.statuses[0])}
+
+        def snapshot_racing_post(vmset_url, logger=None):
+            cable.invalidate_cache()  # A POST to the port started while the status was in flight
+            return stale
+
+        with patch.object(YCable, 'get_all_statuses', side_effect=snapshot_racing_post):
+            assert cable._get_status() == stale[0]
+        assert cable._port_status == (0, None)
+
+
+class TestStatusGetters:
+
+    def test_alive_status(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        assert cable.get_alive_status()
+
+    def test_not_alive_when_status_unreadable(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        with patch.object(YCable, 'POLL_TIMEOUT', -1), \
+                patch.object(y_cable_simulated._connection_pool, 'request', side_effect=ConnectionRefusedError):
+            assert not cable.get_alive_status()
+        cable._initialized = False
+        assert not cable.get_alive_status()
+
+    def test_switch_counts(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        mux_simulator.statuses[0]['flap_counter'] = 5
+        assert cable.get_switch_count_total(YCable.SWITCH_COUNT_MANUAL) == 5
+        assert cable.get_switch_count_tor_a() == 2
+        assert cable.get_switch_count_tor_b() == 2
+        assert cable.get_switch_count_target(YCable.SWITCH_COUNT_AUTO, YCable.TARGET_TOR_A) == 2
+        assert cable.get_switch_count_target(YCable.SWITCH_COUNT_MANUAL, YCable.TARGET_TOR_B) == 2
+
+    def test_switch_count_clear_on_read(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        mux_simulator.statuses[0]['flap_counter'] = 4
+        assert cable.get_switch_count_tor_a(clear_on_read=True) == 2
+        assert mux_simulator.statuses[0]['flap_counter'] == 0
+        assert cable.get_switch_count_tor_a() == 0
+
+
+class TestToggle:
+
+    @staticmethod
+    def wait_toggle_done(cable):
+        for _ in range(500):
+            if cable.mux_toggle_status == YCable.MUX_TOGGLE_STATUS_NOT_INITIATED_OR_FINISHED:
+                return
+            time.sleep(0.01)
+        pytest.fail('background toggle did not finish')
+
+    def test_manual_toggle_is_synchronous(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        assert cable.toggle_mux_to_tor_b()
+        assert mux_simulator.requests == [('POST', '/mux/{}/0'.format(VM_SET))]
+        assert mux_simulator.statuses[0]['active_side'] == YCable.LOWER_TOR
+        assert cable.mux_toggle_status == YCable.MUX_TOGGLE_STATUS_NOT_INITIATED_OR_FINISHED
+        assert cable.get_mux_direction() == YCable.TARGET_TOR_B
+
+    def test_auto_toggle_in_background(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        cable.set_switching_mode(YCable.SWITCHING_MODE_AUTO)
+        mux_simulator.post_gate.clear()
+        assert cable.toggle_mux_to_tor_b()
+        assert mux_simulator.post_received.wait(5)
+        assert cable.mux_toggle_status == YCable.MUX_TOGGLE_STATUS_INPROGRESS
+        # Polled while the POST is in flight
+        assert cable.get_mux_direction() == YCable.TARGET_TOR_A
+        mux_simulator.post_gate.set()
+        self.wait_toggle_done(cable)
+        assert cable.get_mux_direction() == YCable.TARGET_TOR_B
+
+    def test_auto_toggles_coalesced(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        cable.set_switching_mode(YCable.SWITCHING_MODE_AUTO)
+        mux_simulator.post_gate.clear()
+        assert cable.toggle_mux_to_tor_b()
+        assert mux_simulator.post_received.wait(5)
+        # Requested while the toggle to ToR B is in flight, only the last one is posted
+        assert cable.toggle_mux_to_tor_a()
+        assert cable.toggle_mux_to_tor_b()
+        assert cable.toggle_mux_to_tor_a()
+        mux_simulator.post_gate.set()
+        self.wait_toggle_done(cable)
+        posts = [path for method, path in mux_simulator.requests if method == 'POST']
+        assert len(posts) == 2
+        assert mux_simulator.statuses[0]['active_side'] == YCable.UPPER_TOR
+        assert cable.get_mux_direction() == YCable.TARGET_TOR_A
+
+
+    def test_uninitialized_auto_toggle_fails(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        cable.set_switching_mode(YCable.SWITCHING_MODE_AUTO)
+        cable._initialized = False
+        assert not cable.toggle_mux_to_tor_b()
+        assert cable.mux_toggle_status == YCable.MUX_TOGGLE_STATUS_NOT_INITIATED_OR_FINISHED
+        assert mux_simulator.requests == []
+
+    def test_manual_toggle_lands_after_queued_toggle(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        cable.set_switching_mode(YCable.SWITCHING_MODE_AUTO)
+        mux_simulator.post_gate.clear()
+        assert cable.toggle_mux_to_tor_b()
+        assert mux_simulator.post_received.wait(5)
+        assert cable.toggle_mux_to_tor_a()  # Queued behind the toggle in flight
+        cable.set_switching_mode(YCable.SWITCHING_MODE_MANUAL)
+        result = []
+        toggle = threading.Thread(target=lambda: result.append(cable.toggle_mux_to_tor_b()))
+        toggle.start()
+        toggle.join(0.2)
+        assert toggle.is_alive()  # Waits for the queued toggle
+        mux_simulator.post_gate.set()
+        toggle.join(5)
+        assert result == [True]
+        assert len([method for method, _ in mux_simulator.requests if method == 'POST']) == 3
+        assert mux_simulator.statuses[0]['active_side'] == YCable.LOWER_TOR
+        assert cable.mux_toggle_status == YCable.MUX_TOGGLE_STATUS_NOT_INITIATED_OR_FINISHED
+
+    def test_failed_background_toggle_does_not_block(self, mux_simulator, make_cable):
+        cable = make_cable(1)
+        cable.set_switching_mode(YCable.SWITCHING_MODE_AUTO)
+        with patch.object(YCable, '_toggle_to_sync', side_effect=RuntimeError('boom')):
+            assert cable.toggle_mux_to_tor_b()
+            self.wait_toggle_done(cable)
+        assert 'boom' in cable._logger.log_warning.call_args[0][0]
+        assert cable.toggle_mux_to_tor_b()
+        self.wait_toggle_done(cable)
+        assert mux_simulator.statuses[0]['active_side'] == YCable.LOWER_TOR
+        cable.set_switching_mode(YCable.SWITCHING_MODE_MANUAL)
+        assert cable.toggle_mux_to_tor_a()
+
+
+class TestStubs:
+
+    def test_empty_results_not_shared(self, make_cable):
+        cable_1, cable_2 = make_cable(1), make_cable(2)
+        cable_1.get_pcs_stats(YCable.TARGET_NIC)['leak'] = 1
+        cable_1.get_event_log().append('leak')
+        assert cable_2.get_pcs_stats(YCable.TARGET_NIC) == {}
+        assert cable_2.get_fec_stats(YCable.TARGET_NIC) == {}
+        assert cable_2.get_anlt_stats(YCable.TARGET_NIC) == {}
+        assert cable_2.get_event_log() == []
+        assert cable_2.debug_dump_registers() == {}
+
+    def test_supports_nothing(self, make_cable):
+        cable = make_cable(1)
+        assert not any(cable.supports(cap) for cap in (
+            YCable.CAP_FEC_STATS, YCable.CAP_PCS_STATS, YCable.CAP_ANLT_STATS, YCable.CAP_LOOPBACK,
+            YCable.CAP_DEBUG_REG, YCable.CAP_FEC_STATS | YCable.CAP_PCS_STATS, YCable.CAP_ALL))
+
+    def test_ber_info(self, make_cable):
+        assert make_cable(1).get_ber_info(YCable.EYE_PRBS_LOOPBACK_TARGET_NIC) == (0, 0, 0, 0)
+
+    def test_debug_dump_registers_into_dict(self, make_cable):
+        cable = make_cable(1)
+        out = {'stale': 1}
+        assert cable.debug_dump_registers(out=out) is out
+        assert out == {}